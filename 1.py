@@ -1,6 +1,19 @@
+import argparse
+import bisect
+import heapq
+import io
+import json
+import math
+import mmap
+import os
+import struct
+import time
 import unittest
-from typing import Iterator
-from unittest.mock import patch, mock_open
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from functools import cache, partial
+from typing import BinaryIO, Iterable, Iterator, TextIO
 
 
 def read_elf(list_of_calories: Iterator[str]) -> Iterator[tuple[int]]:
@@ -11,6 +24,8 @@ def read_elf(list_of_calories: Iterator[str]) -> Iterator[tuple[int]]:
             elf_bag = []
             continue
         elf_bag.append(int(item))
+    if elf_bag:  # last elf without trailing blank line
+        yield tuple(elf_bag)
 
 
 class ReadOneElfAtATimeTestCase(unittest.TestCase):
@@ -45,9 +60,83 @@ class ReadOneElfAtATimeTestCase(unittest.TestCase):
         output = next(elf_reader)
         self.assertEqual(output, (1000, 2000))
 
+    def test_last_elf_without_trailing_blank_line(self):
+        list_of_calories = ["1000", "", "1000", "2000"]
+        self.assertEqual([(1000,), (1000, 2000)], list(read_elf(list_of_calories)))
+
+
+@dataclass
+class TopCalories:
+    """Partial result holding k heaviest bags seen so far. Results of separate shards can be merged."""
+
+    k: int
+    heaviest: list[int] = field(default_factory=list)  # min-heap, the lightest of top k bags is on the top
+    elfs: int = 0
+
+    def __post_init__(self):
+        if self.k < 1:
+            raise ValueError(f"We need to track at least one bag, got k={self.k}!")
+
+    def add(self, calories: int) -> None:
+        self.elfs += 1
+        if len(self.heaviest) < self.k:
+            heapq.heappush(self.heaviest, calories)
+        elif calories > self.heaviest[0]:
+            heapq.heapreplace(self.heaviest, calories)
+
+    def merge(self, other: "TopCalories") -> "TopCalories":
+        merged = TopCalories(self.k, list(self.heaviest))
+        for calories in other.heaviest:
+            merged.add(calories)
+        merged.elfs = self.elfs + other.elfs
+        return merged
+
+    @property
+    def heaviest_bag(self) -> int:
+        return max(self.heaviest, default=0)
+
+    @property
+    def total(self) -> int:
+        return sum(self.heaviest)
+
+
+def collect_top_calories(elf_reader: Iterator[tuple[int]], k: int) -> TopCalories:
+    top = TopCalories(k)
+    for calories in map(sum, elf_reader):
+        top.add(calories)
+    return top
+
+
+def top_k_heaviest_calories(elf_reader: Iterator[tuple[int]], k: int) -> int:
+    return collect_top_calories(elf_reader, k).total
+
+
+class TopKHeaviestCaloriesTestCase(unittest.TestCase):
+    def test_no_elfs_should_carry_nothing(self):
+        self.assertEqual(0, top_k_heaviest_calories(iter([]), k=3))
+
+    def test_less_elfs_than_k_should_sum_all_of_them(self):
+        self.assertEqual(3000, top_k_heaviest_calories(iter([(1000,), (2000,)]), k=3))
+
+    def test_k_heaviest_are_summed(self):
+        elf_bags = [(1000,), (5000,), (2000, 2000), (3000,), ()]
+        self.assertEqual(9000, top_k_heaviest_calories(iter(elf_bags), k=2))
+
+    def test_k_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            top_k_heaviest_calories(iter([(1000,)]), k=0)
+
+    def test_merge_of_shards_is_the_same_as_one_pass(self):
+        shard1 = collect_top_calories(iter([(1000,), (7000,), (2000,)]), k=3)
+        shard2 = collect_top_calories(iter([(6000,), (3000,)]), k=3)
+        self.assertEqual([3000, 6000, 7000], sorted(shard1.merge(shard2).heaviest))
+        self.assertEqual(16000, shard1.merge(shard2).total)
+        self.assertEqual(7000, shard1.merge(shard2).heaviest_bag)
+        self.assertEqual(5, shard1.merge(shard2).elfs)
+
 
 def heaviest_bag_calories(elf_reader: Iterator[tuple[int]]) -> int:
-    return max(map(sum, elf_reader))
+    return top_k_heaviest_calories(elf_reader, k=1)
 
 
 class HeaviestCaloriesContentTestCase(unittest.TestCase):
@@ -67,40 +156,53 @@ class HeaviestCaloriesContentTestCase(unittest.TestCase):
         self.assertEqual(calories, 4000)
 
 
-def read_list_of_calories_from_file(file_name: str) -> Iterator[str]:
-    with open(file_name, "rt") as file:
-        return (line[:-1] for line in file.readlines())  # we strip the newline character
+CHUNK_SIZE = 1 << 16
+
+
+def _split_lines(chunks: Iterable[str]) -> Iterator[str]:
+    rest = ""
+    for chunk in chunks:
+        lines = (rest + chunk).split("\n")
+        rest = lines.pop()  # incomplete line, continues in the next chunk
+        yield from lines
+    if rest:  # last line without newline character
+        yield rest
+
+
+def _iter_lines(file: TextIO, chunk_size: int) -> Iterator[str]:
+    with file:
+        yield from _split_lines(iter(partial(file.read, chunk_size), ""))
+
+
+def read_list_of_calories_from_file(file_name: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    # file is read lazily in chunks, so memory doesn't grow with the size of the file
+    return _iter_lines(open(file_name, "rt"), chunk_size)
 
 
 class ReadListOfCaloriesFromFileTestCase(unittest.TestCase):
     def test_read_list_of_calories_from_empty_file(self):
+        from unittest.mock import patch, mock_open
+
         with patch(f"{__name__}.open", mock_open(read_data="")) as m:
             list_of_calories = read_list_of_calories_from_file(file_name="1.in")
         m.assert_called_once_with("1.in", "rt")
         self.assertEqual([], list(list_of_calories))
 
     def test_read_list_of_calories_from_file(self):
+        from unittest.mock import patch, mock_open
+
         with patch(f"{__name__}.open", mock_open(read_data="1000\n2000\n\n1000\n\n")) as m:
             list_of_calories = read_list_of_calories_from_file(file_name="1.in")
         m.assert_called_once_with("1.in", "rt")
         self.assertEqual(["1000", "2000", "", "1000", ""], list(list_of_calories))
 
+    def test_read_list_of_calories_with_line_split_between_chunks(self):
+        list_of_calories = _iter_lines(io.StringIO("1000\n2000\n\n1000"), chunk_size=3)
+        self.assertEqual(["1000", "2000", "", "1000"], list(list_of_calories))
+
 
 def top_three_heaviest_calories(elf_reader: Iterator[tuple[int]]) -> int:
-    elf_bag = map(sum, elf_reader)
-    # prime the list with first 3 items, we need them sorted to simplify comparison logic
-    first, second, third = sorted((next(elf_bag), next(elf_bag), next(elf_bag)), reverse=True)
-    for bag in elf_bag:
-        if bag > first:
-            third = second
-            second = first
-            first = bag
-        elif bag > second:
-            third = second
-            second = bag
-        elif bag > third:
-            third = bag
-    return first + second + third
+    return top_k_heaviest_calories(elf_reader, k=3)
 
 
 class HeaviestTopTreeCaloriesContentTestCase(unittest.TestCase):
@@ -144,7 +246,565 @@ class HeaviestTopTreeCaloriesContentTestCase(unittest.TestCase):
         self.assertEqual(10000, calories)
 
 
-if __name__ == '__main__':
-    print("Heaviest calories:", heaviest_bag_calories(read_elf(read_list_of_calories_from_file("1.in"))))
-    print("Sum of three heaviest calories:", top_three_heaviest_calories(read_elf(read_list_of_calories_from_file("1.in"))))
+def _find_elf_boundary(file: BinaryIO, offset: int, chunk_size: int) -> int:
+    """Returns position of the first line after a blank line, found from `offset` onwards, or end of the file."""
+    file.seek(offset)
+    tail = b""
+    while chunk := file.read(chunk_size):
+        data = tail + chunk
+        # a blank line ends with "\n\n", or with "\n\r\n" when lines end with CRLF
+        ends = [found + len(separator) for separator in (b"\n\n", b"\n\r\n") if (found := data.find(separator)) >= 0]
+        if ends:
+            return offset - len(tail) + min(ends)
+        offset += len(chunk)
+        tail = data[-2:]  # blank line may be split between chunks
+    return offset
+
+
+def split_calories_file(file_name: str, shards: int, chunk_size: int = CHUNK_SIZE) -> list[tuple[int, int]]:
+    """Splits file to byte ranges `[start, stop)` so that every elf's bag belongs to exactly one range."""
+    size = os.path.getsize(file_name)
+    boundaries = [0]
+    with open(file_name, "rb") as file:
+        for shard in range(1, shards):
+            boundary = _find_elf_boundary(file, max(size * shard // shards, boundaries[-1]), chunk_size)
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _read_shard_chunks(file_name: str, start: int, stop: int, chunk_size: int) -> Iterator[str]:
+    with open(file_name, "rb") as file:
+        file.seek(start)
+        while start < stop and (chunk := file.read(min(chunk_size, stop - start))):
+            start += len(chunk)
+            yield chunk.decode()
+
+
+def collect_shard_top_calories(file_name: str, start: int, stop: int, k: int) -> TopCalories:
+    lines = _split_lines(_read_shard_chunks(file_name, start, stop, CHUNK_SIZE))
+    return collect_top_calories(read_elf(line.rstrip("\r") for line in lines), k)
+
+
+def parallel_top_calories(file_name: str, k: int, workers: int | None = None) -> TopCalories:
+    """Processes shards of the file in a process pool and merges their partial results."""
+    from concurrent.futures import ProcessPoolExecutor  # slow to import and needed only here
+
+    workers = workers or os.cpu_count() or 1
+    shards = split_calories_file(file_name, workers)
+    result = TopCalories(k)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(collect_shard_top_calories, file_name, start, stop, k) for start, stop in shards]
+        for future in futures:
+            result = result.merge(future.result())
+    return result
+
+
+def _write_test_file(test: unittest.TestCase, content: str | bytes) -> str:
+    """Writes `content` to a temporary input file removed after the test, bytes are written as they are."""
+    import tempfile
+
+    with tempfile.NamedTemporaryFile("wb" if isinstance(content, bytes) else "wt", suffix=".in", delete=False) as file:
+        file.write(content)
+    test.addCleanup(os.remove, file.name)
+    return file.name
+
+
+class ParallelCaloriesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.file_name = _write_test_file(self, "1000\n2000\n\n\n4000\n\n5000\n6000\n\n7000\n8000\n9000\n\n10000")
+
+    def test_shards_are_aligned_to_elf_bags(self):
+        with open(self.file_name, "rt") as file:
+            content = file.read()
+        for shards in range(1, 12):
+            ranges = split_calories_file(self.file_name, shards, chunk_size=2)
+            self.assertEqual(0, ranges[0][0])
+            self.assertEqual(len(content), ranges[-1][1])
+            for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(stop, start)
+                self.assertEqual("\n\n", content[stop - 2 : stop])
+
+    def test_shards_together_have_all_elfs(self):
+        elfs = [
+            collect_shard_top_calories(self.file_name, start, stop, k=3).elfs
+            for start, stop in split_calories_file(self.file_name, shards=4)
+        ]
+        self.assertEqual(6, sum(elfs))
+
+    def test_parallel_result_is_the_same_as_sequential(self):
+        result = parallel_top_calories(self.file_name, k=3, workers=3)
+        self.assertEqual(6, result.elfs)
+        self.assertEqual(24000, result.heaviest_bag)
+        self.assertEqual(45000, result.total)
+
+    def test_crlf_line_endings(self):
+        content = b"1000\r\n2000\r\n\r\n\r\n4000\r\n\r\n5000\r\n6000\r\n\r\n7000\r\n8000\r\n9000\r\n\r\n10000"
+        file_name = _write_test_file(self, content)
+        for shards in range(1, 12):
+            ranges = split_calories_file(file_name, shards, chunk_size=2)
+            self.assertEqual(len(content), ranges[-1][1])
+            self.assertEqual(shards > 1, len(ranges) > 1)
+            for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(stop, start)
+                self.assertEqual(b"\r\n\r\n", content[stop - 4 : stop])
+        result = parallel_top_calories(file_name, k=3, workers=3)
+        self.assertEqual((6, 24000, 45000), (result.elfs, result.heaviest_bag, result.total))
+
+    def test_empty_file_has_no_elfs(self):
+        with open(self.file_name, "wt"):
+            pass
+        self.assertEqual([], split_calories_file(self.file_name, shards=2))
+        self.assertEqual(0, parallel_top_calories(self.file_name, k=3, workers=2).elfs)
+
+
+@cache
+def _numpy():
+    """numpy is optional and slow to import, so it's imported on the first use only."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def load_calories_array(file_name: str) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    Parses the whole file at once.
+
+    :return: calories of all items and offsets of elf bags into them, bag `i` is `items[offsets[i]:offsets[i + 1]]`
+    """
+    np = _numpy()
+    if np is None:
+        raise ImportError("load_calories_array needs numpy, which is not installed")
+    with open(file_name, "rb") as file:
+        data = file.read()
+    if not data:
+        return np.zeros(0, dtype=np.int64), np.zeros(1, dtype=np.int64)
+    if b"\r" in data:  # "\r" before "\n" is a part of the line ending, as in the text mode reader
+        data = data.replace(b"\r\n", b"\n")
+    if not data.endswith(b"\n"):  # last line without newline character
+        data += b"\n"
+
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    is_newline = buffer == ord("\n")
+    if np.any(~is_newline & ((buffer < ord("0")) | (buffer > ord("9")))):
+        raise ValueError(f"Unexpected characters in calories file {file_name}!")
+    newlines = np.flatnonzero(is_newline)
+    line_starts = np.concatenate(([0], newlines[:-1] + 1))
+
+    # every digit contributes to its line by digit * 10^(distance from the end of the line)
+    line_of_byte = np.repeat(np.arange(len(newlines)), newlines - line_starts + 1)
+    powers = np.where(is_newline, 0, newlines[line_of_byte] - np.arange(len(buffer)) - 1)
+    digits = np.where(is_newline, 0, buffer.astype(np.int64) - ord("0"))
+    lines = np.add.reduceat(digits * 10**powers, line_starts)
+
+    is_blank = newlines == line_starts
+    items = lines[~is_blank]
+    items_before_line = np.cumsum(~is_blank) - ~is_blank
+    bag_ends = items_before_line[is_blank]
+    if not is_blank[-1]:  # last elf without trailing blank line
+        bag_ends = np.append(bag_ends, len(items))
+    return items, np.concatenate(([0], bag_ends))
+
+
+def numpy_top_calories(file_name: str, k: int) -> TopCalories:
+    items, offsets = load_calories_array(file_name)
+    np = _numpy()
+    # totals of all bags by one segmented reduction over the prefix sums, empty bags naturally sum to zero
+    prefix_sums = np.concatenate(([0], np.cumsum(items)))
+    totals = prefix_sums[offsets[1:]] - prefix_sums[offsets[:-1]]
+    top = TopCalories(k, elfs=len(totals))
+    top_count = min(k, len(totals))
+    if top_count:
+        top.heaviest = sorted(totals[np.argpartition(totals, -top_count)[-top_count:]].tolist())
+    return top
+
+
+class NumpyCaloriesTestCase(unittest.TestCase):
+    def setUp(self):
+        if _numpy() is None:
+            self.skipTest("numpy is not installed")
+
+    def test_bags_are_split_by_offsets(self):
+        items, offsets = load_calories_array(_write_test_file(self, "1000\n2000\n\n\n300\n"))
+        self.assertEqual([1000, 2000, 300], items.tolist())
+        self.assertEqual([0, 2, 2, 3], offsets.tolist())
+
+    def test_results_are_the_same_as_pure_python(self):
+        contents = (
+            "",
+            "\n",
+            "1000",
+            "1000\n\n",
+            "\n\n1000\n",
+            "1000\n2000\n\n\n4000\n\n5000\n6000\n\n7000\n8000\n9000\n\n10000",
+            b"1000\r\n2000\r\n\r\n\r\n4000\r\n\r\n5000\r\n6000\r\n\r\n7000\r\n8000\r\n9000\r\n\r\n10000",
+            b"1000\r\n\r\n",
+        )
+        for content in contents:
+            file_name = _write_test_file(self, content)
+            expected = collect_top_calories(read_elf(read_list_of_calories_from_file(file_name)), k=3)
+            result = numpy_top_calories(file_name, k=3)
+            self.assertEqual(expected.elfs, result.elfs, repr(content))
+            self.assertEqual(sorted(expected.heaviest), result.heaviest, repr(content))
+
+    def test_unexpected_characters_should_raise(self):
+        with self.assertRaises(ValueError):
+            load_calories_array(_write_test_file(self, "1000\nabc\n"))
+        with self.assertRaises(ValueError):
+            load_calories_array(_write_test_file(self, b"1000\r2000\n"))
+
+
+@dataclass
+class CaloriesCheckpoint:
+    """State of an appended calories file processed up to `offset`, the bag of the last elf may be still open."""
+
+    top: TopCalories
+    offset: int = 0  # position right after the last processed line
+    open_bag_items: int = 0
+    open_bag_calories: int = 0
+    inode: int = 0  # identity of the processed file, so a replaced file isn't taken as appended
+    fingerprint: int = 0  # checksum of bytes before `offset`, see `_file_fingerprint`
+
+    @classmethod
+    def load(cls, checkpoint_file: str, k: int) -> "CaloriesCheckpoint":
+        try:
+            with open(checkpoint_file, "rt") as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return cls(TopCalories(k))
+        if state["k"] != k:  # we can't derive a different top k from the stored one
+            return cls(TopCalories(k))
+        top = TopCalories(state["k"], state["heaviest"], state["elfs"])
+        return cls(
+            top,
+            state["offset"],
+            state["open_bag_items"],
+            state["open_bag_calories"],
+            state.get("inode", 0),
+            state.get("fingerprint", 0),
+        )
+
+    def save(self, checkpoint_file: str) -> None:
+        state = {
+            "k": self.top.k,
+            "heaviest": self.top.heaviest,
+            "elfs": self.top.elfs,
+            "offset": self.offset,
+            "open_bag_items": self.open_bag_items,
+            "open_bag_calories": self.open_bag_calories,
+            "inode": self.inode,
+            "fingerprint": self.fingerprint,
+        }
+        with open(f"{checkpoint_file}.tmp", "wt") as file:
+            json.dump(state, file)
+        os.replace(f"{checkpoint_file}.tmp", checkpoint_file)  # we never leave half written checkpoint behind
+
+    def consume(self, list_of_calories: Iterable[str]) -> None:
+        for item in list_of_calories:
+            if item == "":  # end of elfs bag
+                self.top.add(self.open_bag_calories)
+                self.open_bag_items = self.open_bag_calories = 0
+                continue
+            self.open_bag_items += 1
+            self.open_bag_calories += int(item)
+
+    @property
+    def current(self) -> TopCalories:
+        """Result as if the file ended right now, so the open bag is counted too."""
+        if not self.open_bag_items:
+            return self.top
+        return self.top.merge(TopCalories(self.top.k, [self.open_bag_calories], elfs=1))
+
+
+FINGERPRINT_SIZE = 4096
+
+
+def _file_fingerprint(file_name: str, offset: int) -> int:
+    """Checksum of the first and the last `FINGERPRINT_SIZE` bytes before `offset`, appends don't change it."""
+    with open(file_name, "rb") as file:
+        head = file.read(min(offset, FINGERPRINT_SIZE))
+        file.seek(max(offset - FINGERPRINT_SIZE, 0))
+        tail = file.read(min(offset, FINGERPRINT_SIZE))
+    return zlib.crc32(tail, zlib.crc32(head))
+
+
+def follow_calories(file_name: str, k: int, checkpoint_file: str | None = None) -> TopCalories:
+    """Processes only the bytes appended to the file since the last call, the state is kept in `checkpoint_file`."""
+    checkpoint_file = checkpoint_file or f"{file_name}.checkpoint"
+    checkpoint = CaloriesCheckpoint.load(checkpoint_file, k)
+    stat = os.stat(file_name)
+    size = stat.st_size
+    if (
+        size < checkpoint.offset
+        or checkpoint.inode != stat.st_ino
+        or checkpoint.fingerprint != _file_fingerprint(file_name, checkpoint.offset)
+    ):  # file was truncated or replaced, we have to start over
+        checkpoint = CaloriesCheckpoint(TopCalories(k), inode=stat.st_ino, fingerprint=_file_fingerprint(file_name, 0))
+
+    rest = ""
+    for chunk in _read_shard_chunks(file_name, checkpoint.offset, size, CHUNK_SIZE):
+        lines = (rest + chunk).split("\n")
+        rest = lines.pop()
+        checkpoint.consume(line.rstrip("\r") for line in lines)
+    checkpoint.offset = size - len(rest.encode())  # incomplete line is still being written, we take it next time
+    checkpoint.fingerprint = _file_fingerprint(file_name, checkpoint.offset)
+    checkpoint.save(checkpoint_file)
+    return checkpoint.current
+
+
+def watch_calories(file_name: str, k: int, interval: float = 1.0) -> Iterator[TopCalories]:
+    last_size = None
+    while True:
+        size = os.path.getsize(file_name)
+        if size != last_size:
+            last_size = size
+            yield follow_calories(file_name, k)
+        time.sleep(interval)
+
+
+class FollowCaloriesTestCase(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_name = os.path.join(directory.name, "1.in")
+        self.checkpoint_file = os.path.join(directory.name, "1.in.checkpoint")
+
+    def _append(self, content: str) -> TopCalories:
+        with open(self.file_name, "at") as file:
+            file.write(content)
+        return follow_calories(self.file_name, k=2, checkpoint_file=self.checkpoint_file)
+
+    def test_appended_data_are_processed(self):
+        self.assertEqual(0, self._append("").elfs)
+        result = self._append("1000\n2000\n\n")
+        self.assertEqual((1, 3000), (result.elfs, result.total))
+        result = self._append("5000\n\n4000\n\n")
+        self.assertEqual((3, 9000), (result.elfs, result.total))
+
+    def test_open_bag_is_counted_but_stays_open(self):
+        result = self._append("1000\n\n2000\n")
+        self.assertEqual((2, 3000), (result.elfs, result.total))
+        result = self._append("3000\n\n")
+        self.assertEqual((2, 6000), (result.elfs, result.total))
+
+    def test_incomplete_line_waits_for_the_rest(self):
+        result = self._append("1000\n\n20")
+        self.assertEqual((1, 1000), (result.elfs, result.total))
+        result = self._append("00\n\n")
+        self.assertEqual((2, 3000), (result.elfs, result.total))
+
+    def test_only_new_bytes_are_read(self):
+        self._append("1000\n\n")
+        with open(self.checkpoint_file, "rt") as file:
+            self.assertEqual(6, json.load(file)["offset"])
+
+    def test_truncated_file_is_processed_from_start(self):
+        self._append("1000\n\n2000\n\n")
+        with open(self.file_name, "wt") as file:
+            file.write("500\n\n")
+        result = follow_calories(self.file_name, k=2, checkpoint_file=self.checkpoint_file)
+        self.assertEqual((1, 500), (result.elfs, result.total))
+
+    def test_replaced_file_is_processed_from_start(self):
+        self._append("1000\n\n2000\n\n")
+        with open(self.file_name, "wt") as file:  # the same inode and a larger size
+            file.write("3000\n\n4000\n\n5000\n\n")
+        result = follow_calories(self.file_name, k=2, checkpoint_file=self.checkpoint_file)
+        self.assertEqual((3, 9000), (result.elfs, result.total))
+        with open(f"{self.file_name}.new", "wt") as file:
+            file.write("6000\n\n7000\n\n8000\n\n")
+        os.replace(f"{self.file_name}.new", self.file_name)  # a new inode
+        result = follow_calories(self.file_name, k=2, checkpoint_file=self.checkpoint_file)
+        self.assertEqual((3, 15000), (result.elfs, result.total))
+
+    def test_crlf_line_endings(self):
+        with open(self.file_name, "wb") as file:
+            file.write(b"1000\r\n2000\r\n\r\n40")
+        result = follow_calories(self.file_name, k=2, checkpoint_file=self.checkpoint_file)
+        self.assertEqual((1, 3000), (result.elfs, result.total))
+        with open(self.file_name, "ab") as file:
+            file.write(b"00\r\n\r\n")
+        result = follow_calories(self.file_name, k=2, checkpoint_file=self.checkpoint_file)
+        self.assertEqual((2, 7000), (result.elfs, result.total))
+
+
+class RankIndex:
+    """
+    Binary index of all bag totals sorted from the lightest, persisted next to the calories file.
+
+    Layout is a header followed by three arrays of `count` native int64 values: sorted totals, elf ids in the same
+    order and the position of every elf in the sorted order. Elf ids are indexes of elfs in the calories file.
+    """
+
+    HEADER = struct.Struct("=8sqqq")  # magic, source file size, source file mtime, count of elfs
+    MAGIC = b"ELFRANK1"
+
+    def __init__(self, index_file: str):
+        with open(index_file, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, _, self._count = self.HEADER.unpack_from(self._mmap)
+        view = memoryview(self._mmap)[self.HEADER.size :]
+        array_size = self._count * 8
+        self._totals = view[:array_size].cast("q")
+        self._elf_ids = view[array_size : 2 * array_size].cast("q")
+        self._positions = view[2 * array_size : 3 * array_size].cast("q")
+        view.release()
+
+    @staticmethod
+    def index_file_for(file_name: str) -> str:
+        return f"{file_name}.index"
+
+    @classmethod
+    def build(cls, file_name: str, index_file: str | None = None) -> str:
+        index_file = index_file or cls.index_file_for(file_name)
+        stat = os.stat(file_name)  # taken before reading, so changes made meanwhile invalidate the index
+        totals = list(map(sum, read_elf(read_list_of_calories_from_file(file_name))))
+        elf_ids = array("q", sorted(range(len(totals)), key=totals.__getitem__))
+        positions = array("q", bytes(8 * len(totals)))
+        for position, elf_id in enumerate(elf_ids):
+            positions[elf_id] = position
+        with open(f"{index_file}.tmp", "wb") as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, stat.st_size, stat.st_mtime_ns, len(totals)))
+            array("q", (totals[elf_id] for elf_id in elf_ids)).tofile(file)
+            elf_ids.tofile(file)
+            positions.tofile(file)
+        os.replace(f"{index_file}.tmp", index_file)
+        return index_file
+
+    @classmethod
+    def is_fresh(cls, file_name: str, index_file: str) -> bool:
+        try:
+            with open(index_file, "rb") as file:
+                magic, size, mtime, _ = cls.HEADER.unpack(file.read(cls.HEADER.size))
+        except (FileNotFoundError, struct.error):
+            return False
+        stat = os.stat(file_name)
+        return magic == cls.MAGIC and size == stat.st_size and mtime == stat.st_mtime_ns
+
+    @classmethod
+    def open(cls, file_name: str, index_file: str | None = None) -> "RankIndex":
+        """Opens the index of the calories file, it is (re)built when missing or outdated."""
+        index_file = index_file or cls.index_file_for(file_name)
+        if not cls.is_fresh(file_name, index_file):
+            cls.build(file_name, index_file)
+        return cls(index_file)
+
+    def close(self) -> None:
+        for view in (self._totals, self._elf_ids, self._positions):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "RankIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def top_k(self, k: int) -> list[tuple[int, int]]:
+        """:return: `(elf id, total)` of k heaviest bags, the heaviest first"""
+        return [(self._elf_ids[i], self._totals[i]) for i in range(self._count - 1, max(self._count - k, 0) - 1, -1)]
+
+    def top_k_calories(self, k: int) -> int:
+        return sum(total for _, total in self.top_k(k))
+
+    def calories_of(self, elf_id: int) -> int:
+        return self._totals[self._positions[elf_id]]
+
+    def rank_of(self, elf_id: int) -> int:
+        """:return: 1 for the heaviest bag, elfs with equal bags share the rank"""
+        return self._count - bisect.bisect_right(self._totals, self.calories_of(elf_id)) + 1
+
+    def percentile(self, percent: float) -> int:
+        """:return: the lightest total, which is heavier or equal to `percent` % of all bags (nearest rank)"""
+        if not self._count:
+            raise ValueError("There are no elfs in the index!")
+        if not 0 < percent <= 100:
+            raise ValueError(f"Percentile must be in range (0, 100], got {percent}!")
+        return self._totals[math.ceil(percent / 100 * self._count) - 1]
+
+
+class RankIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_name = os.path.join(directory.name, "1.in")
+        with open(self.file_name, "wt") as file:
+            file.write("1000\n2000\n\n\n4000\n\n5000\n6000\n\n3000\n1000\n\n10000\n")
+
+    def test_top_k(self):
+        with RankIndex.open(self.file_name) as index:
+            self.assertEqual(6, len(index))
+            self.assertEqual([(3, 11000), (5, 10000)], index.top_k(2))
+            self.assertEqual(25000, index.top_k_calories(3))
+            self.assertEqual(6, len(index.top_k(10)))
+
+    def test_rank_of_elf(self):
+        with RankIndex.open(self.file_name) as index:
+            self.assertEqual(1, index.rank_of(3))
+            self.assertEqual(3, index.rank_of(2))
+            self.assertEqual(3, index.rank_of(4))  # elf 2 has the same bag
+            self.assertEqual(5, index.rank_of(0))
+            self.assertEqual(6, index.rank_of(1))
+
+    def test_percentile(self):
+        with RankIndex.open(self.file_name) as index:
+            self.assertEqual(11000, index.percentile(100))
+            self.assertEqual(4000, index.percentile(50))
+            self.assertEqual(0, index.percentile(1))
+            with self.assertRaises(ValueError):
+                index.percentile(0)
+
+    def test_changed_file_should_rebuild_index(self):
+        with RankIndex.open(self.file_name) as index:
+            self.assertEqual(6, len(index))
+        with open(self.file_name, "at") as file:
+            file.write("\n20000\n")
+        self.assertFalse(RankIndex.is_fresh(self.file_name, RankIndex.index_file_for(self.file_name)))
+        with RankIndex.open(self.file_name) as index:
+            self.assertEqual(7, len(index))
+            self.assertEqual(1, index.rank_of(6))
+
+
+def load_input(file_name: str) -> TopCalories:
+    """Single streaming pass over the input, both parts are answered from its result."""
+    return collect_top_calories(read_elf(read_list_of_calories_from_file(file_name)), k=3)
+
+
+def solve_part1(top: TopCalories) -> int:
+    return top.heaviest_bag
+
+
+def solve_part2(top: TopCalories) -> int:
+    return top.total
+
+
+class SolveTestCase(unittest.TestCase):
+    def test_both_parts_from_one_load(self):
+        file_name = _write_test_file(self, "1000\n2000\n3000\n\n4000\n\n5000\n6000\n\n7000\n8000\n9000\n\n10000\n")
+        top = load_input(file_name)
+        self.assertEqual(24000, solve_part1(top))
+        self.assertEqual(45000, solve_part2(top))
+
 
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--follow", action="store_true", help="keep processing data appended to the input file")
+    args = parser.parse_args()
+    if args.follow:
+        for top in watch_calories("1.in", k=3):
+            print("Heaviest calories:", top.heaviest_bag, "Sum of three heaviest calories:", top.total)
+    else:
+        top = load_input("1.in")
+        print("Heaviest calories:", solve_part1(top))
+        print("Sum of three heaviest calories:", solve_part2(top))
@@ -1,7 +1,15 @@
+import mmap
+import os
+import sys
+import time
 import unittest
+from array import array
 from dataclasses import dataclass
 from enum import IntEnum
-from unittest.mock import patch, mock_open
+from functools import cache
+from itertools import chain, combinations, product
+from operator import itemgetter
+from typing import Iterable, Iterator, Sequence
 
 
 class Choice(IntEnum):
@@ -16,18 +24,42 @@ class MatchResult(IntEnum):
     WIN = 6
 
     def opposite(self):
-        if self == MatchResult.LOSS:
-            return MatchResult.WIN
-        elif self == MatchResult.WIN:
-            return MatchResult.LOSS
-        else:
-            return MatchResult.DRAW
+        return OPPOSITE_RESULTS[self]
 
 
-@dataclass
+OPPOSITE_RESULTS = {
+    MatchResult.LOSS: MatchResult.WIN,
+    MatchResult.DRAW: MatchResult.DRAW,
+    MatchResult.WIN: MatchResult.LOSS,
+}
+
+# OPPOSITE_RESULT_BYTES translates results stored as bytes to results of the other player
+OPPOSITE_RESULT_BYTES = bytes(OPPOSITE_RESULTS.get(byte, 0) for byte in range(256))
+
+# OUTCOMES[player1][player2] is match result from the perspective of player1, indexed by choice values directly
+OUTCOMES = tuple(
+    tuple(
+        (MatchResult.DRAW, MatchResult.LOSS, MatchResult.WIN)[(player2 - player1) % 3] if player1 and player2 else None
+        for player2 in range(4)
+    )
+    for player1 in range(4)
+)
+# ROUND_SCORES[player1][player2] are scores of both players for one round
+ROUND_SCORES = tuple(
+    tuple(
+        (player1 + OUTCOMES[player1][player2], player2 + OUTCOMES[player2][player1]) if player1 and player2 else None
+        for player2 in range(4)
+    )
+    for player1 in range(4)
+)
+
+
+@dataclass(slots=True)
 class Player:
-    moves: list[Choice]
-    results: list[MatchResult]
+    # choices and results are stored as their values, one byte per round
+    moves: array
+    results: array
+    score: int = 0  # score of matches played without keeping their history
 
 
 class Game:
@@ -41,15 +73,7 @@ class Game:
     @staticmethod
     def play_match(player1: Choice, player2: Choice) -> MatchResult:
         """Returns match result from the perspective of player1"""
-        result = None
-        match player1, player2:
-            case (Choice.ROCK, Choice.SCISSORS) | (Choice.SCISSORS, Choice.PAPER) | (Choice.PAPER, Choice.ROCK):
-                result = MatchResult.WIN
-            case (Choice.SCISSORS, Choice.ROCK) | (Choice.PAPER, Choice.SCISSORS) | (Choice.ROCK, Choice.PAPER):
-                result = MatchResult.LOSS
-            case _ if player1 == player2:
-                result = MatchResult.DRAW
-        return result
+        return OUTCOMES[player1][player2]
 
     def play(self) -> int:
         """
@@ -60,15 +84,52 @@ class Game:
 
         player1 = self.get_player(1)
         player2 = self.get_player(2)
-        for player1_choice, player2_choice in zip(player1.moves, player2.moves, strict=True):
-            result = self.play_match(player1_choice, player2_choice)
-            player1.results.append(result)
-            player2.results.append(result.opposite())
+        if len(player1.moves) != len(player2.moves):
+            raise ValueError("Both players have to make the same number of moves!")
+        played = len(player1.results)
+        # results are written straight to the array and the other player's ones are translated from them in bulk
+        player1.results.extend(OUTCOMES[i1][i2] for i1, i2 in zip(player1.moves, player2.moves))
+        player2.results.frombytes(player1.results[played:].tobytes().translate(OPPOSITE_RESULT_BYTES))
 
         return len(self._players[0].results)
 
-    def add_player(self, moves: list[Choice]) -> int:
-        self._players.append(Player(moves, []))
+    def play_stream(self, rounds: Iterable[tuple[Choice, Choice]], keep_history: bool = False) -> int:
+        """
+        Plays rounds as they come, only running scores are kept unless `keep_history` is requested.
+
+        :return: Number of matches played from the stream.
+        """
+        if not self._players:
+            self.add_player([])
+            self.add_player([])
+        if not self.has_enough_players:
+            raise RuntimeError("Not enough players to play the game! We need 2. Please add player to the game.")
+
+        player1 = self.get_player(1)
+        player2 = self.get_player(2)
+        matches = 0
+        if keep_history:
+            for player1_choice, player2_choice in rounds:
+                result = OUTCOMES[player1_choice][player2_choice]
+                player1.moves.append(player1_choice)
+                player1.results.append(result)
+                player2.moves.append(player2_choice)
+                player2.results.append(OPPOSITE_RESULTS[result])
+                matches += 1
+            return matches
+
+        player1_score = player2_score = 0
+        for player1_choice, player2_choice in rounds:
+            round_score1, round_score2 = ROUND_SCORES[player1_choice][player2_choice]
+            player1_score += round_score1
+            player2_score += round_score2
+            matches += 1
+        player1.score += player1_score
+        player2.score += player2_score
+        return matches
+
+    def add_player(self, moves: Iterable[Choice]) -> int:
+        self._players.append(Player(array("b", moves), array("b")))
         return len(self._players)
 
     def get_player(self, no: int) -> Player:
@@ -76,32 +137,67 @@ class Game:
 
     def score_for(self, player_no: int) -> int:
         player = self.get_player(player_no)
-        return sum(player.moves) + sum(player.results)
+        return player.score + _sum_values(player.moves) + _sum_values(player.results)
+
+
+@cache
+def _numpy():
+    """numpy is optional and slow to import, so it's imported on the first use only."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+NUMPY_MIN_VALUES = 100_000  # below it, importing numpy costs more than it saves
+
+
+def _sum_values(values: array) -> int:
+    """Sum of one byte values, vectorised by numpy when it's installed and there are enough values."""
+    np = _numpy() if len(values) >= NUMPY_MIN_VALUES else None
+    if np is None:
+        return sum(values)
+    return int(np.frombuffer(values, dtype=np.int8).sum(dtype=np.int64))
+
+
+# every line of the strategy guide is one of these, followed by a newline
+LINE_TYPES = tuple(f"{opponent} {code}" for opponent in "ABC" for code in "XYZ")
 
 
 class Strategy1:
-    @staticmethod
-    def _map_file_choice(choice: str) -> Choice:
-        match choice:
-            case "A" | "X":
-                return Choice.ROCK
-            case "B" | "Y":
-                return Choice.PAPER
-            case "C" | "Z":
-                return Choice.SCISSORS
+    FILE_CHOICES = {
+        "A": Choice.ROCK,
+        "B": Choice.PAPER,
+        "C": Choice.SCISSORS,
+        "X": Choice.ROCK,
+        "Y": Choice.PAPER,
+        "Z": Choice.SCISSORS,
+    }
+
+    @classmethod
+    def _map_file_choice(cls, choice: str) -> Choice:
+        return cls.FILE_CHOICES.get(choice)
 
     @staticmethod
     def _load_file(file_name: str):
         with open(file_name, "rt") as file:
-            return (line.split(" ") for line in file.read().splitlines())
+            for line in file:
+                yield line.rstrip("\n").split(" ")
 
     @classmethod
-    def apply_strategy(cls, instructions, game: Game) -> Game:
-        player1_moves = []
-        player2_moves = []
+    def iter_rounds(cls, instructions) -> Iterator[tuple[Choice, Choice]]:
+        file_choices = cls.FILE_CHOICES
         for i1, i2 in instructions:
-            player1_moves.append(cls._map_file_choice(i1))
-            player2_moves.append(cls._map_file_choice(i2))
+            yield file_choices[i1], file_choices[i2]
+
+    @classmethod
+    def apply_strategy(cls, instructions, game: Game) -> Game:
+        player1_moves = array("b")
+        player2_moves = array("b")
+        for player1_move, player2_move in cls.iter_rounds(instructions):
+            player1_moves.append(player1_move)
+            player2_moves.append(player2_move)
         game.add_player(player1_moves)
         game.add_player(player2_moves)
         return game
@@ -112,33 +208,175 @@ class Strategy1:
         game = cls.apply_strategy(cls._load_file(file_name), game)
         return game
 
+    @classmethod
+    def line_scores(cls) -> dict[str, int]:
+        """Player2 score of one round for every line type of the guide."""
+        rounds = cls.iter_rounds(line.split(" ") for line in LINE_TYPES)
+        return {line: ROUND_SCORES[player1][player2][1] for line, (player1, player2) in zip(LINE_TYPES, rounds)}
+
+    @classmethod
+    def play_file(cls, file_name, keep_history: bool = False) -> Game:
+        """Plays the game while reading the file, without loading all moves first."""
+        game = Game()
+        game.play_stream(cls.iter_rounds(cls._load_file(file_name)), keep_history)
+        return game
+
+
+def build_responses(file_results: dict[str, MatchResult]) -> dict[str, dict[Choice, Choice]]:
+    """:return: for every expected result code, choices leading to that result against each opponent choice"""
+    return {
+        code: {
+            opponent: response for opponent in Choice for response in Choice if OUTCOMES[response][opponent] == result
+        }
+        for code, result in file_results.items()
+    }
+
 
 class Strategy2(Strategy1):
-    @staticmethod
-    def _map_strategy(opponent_choice: Choice, expected_result: str) -> Choice:
-        result = None
-        match expected_result, opponent_choice:
-            case "Y", _:
-                result = opponent_choice
-            case ("X", Choice.ROCK) | ("Z", Choice.PAPER):
-                result = Choice.SCISSORS
-            case ("X", Choice.SCISSORS) | ("Z", Choice.ROCK):
-                result = Choice.PAPER
-            case ("X", Choice.PAPER) | ("Z", Choice.SCISSORS):
-                result = Choice.ROCK
-        return result
+    FILE_RESULTS = {"X": MatchResult.LOSS, "Y": MatchResult.DRAW, "Z": MatchResult.WIN}
+    # RESPONSES[expected_result][opponent_choice] is the choice leading to the expected result
+    RESPONSES = build_responses(FILE_RESULTS)
 
     @classmethod
-    def apply_strategy(cls, instructions, game: Game) -> Game:
-        player1_moves = []
-        player2_moves = []
+    def _map_strategy(cls, opponent_choice: Choice, expected_result: str) -> Choice:
+        return cls.RESPONSES[expected_result][opponent_choice]
+
+    @classmethod
+    def iter_rounds(cls, instructions) -> Iterator[tuple[Choice, Choice]]:
+        file_choices = cls.FILE_CHOICES
+        responses = cls.RESPONSES
         for i1, i2 in instructions:
-            player1_move = cls._map_file_choice(i1)
-            player1_moves.append(player1_move)
-            player2_moves.append(cls._map_strategy(player1_move, i2))
-        game.add_player(player1_moves)
-        game.add_player(player2_moves)
-        return game
+            player1_move = file_choices[i1]
+            yield player1_move, responses[i2][player1_move]
+
+
+HISTOGRAM_CHUNK_SIZE = 1 << 20  # rounded down to a multiple of line length, so no line is split between chunks
+
+
+def count_line_types(file_name: str) -> dict[str, int]:
+    """Counts every line type of the strategy guide directly in the mapped file, without splitting it to lines."""
+    histogram = dict.fromkeys(LINE_TYPES, 0)
+    if not os.path.getsize(file_name):
+        return histogram
+
+    with open(file_name, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        newline = b"\r\n" if data[3:5] == b"\r\n" else b"\n"  # the first line tells how lines end
+        stride = 3 + len(newline)
+        patterns = {line: line.encode() + newline for line in LINE_TYPES}
+        size = len(data)
+        if data[-1:] != b"\n" and size % stride == 3:  # last line without newline characters
+            size -= 3
+            last_line = data[size:].decode()
+            if last_line in histogram:
+                histogram[last_line] += 1
+        if size % stride:
+            raise ValueError(f"Strategy guide {file_name} doesn't consist of 'X Y' lines only!")
+        # lines have fixed length, so a pattern can match only at the start of a line
+        chunk_size = HISTOGRAM_CHUNK_SIZE // stride * stride
+        for offset in range(0, size, chunk_size):
+            chunk = data[offset : min(offset + chunk_size, size)]
+            for line, pattern in patterns.items():
+                histogram[line] += chunk.count(pattern)
+        if sum(histogram.values()) != size // stride + (size != len(data)):
+            raise ValueError(f"Strategy guide {file_name} doesn't consist of 'X Y' lines only!")
+    return histogram
+
+
+def score_histogram(histogram: dict[str, int], strategy: type[Strategy1]) -> int:
+    line_scores = strategy.line_scores()
+    return sum(count * line_scores[line] for line, count in histogram.items())
+
+
+def score_guide(file_name: str) -> tuple[int, int]:
+    """:return: player2 score based on 1st and 2nd strategy, from one pass over the file"""
+    histogram = count_line_types(file_name)
+    return score_histogram(histogram, Strategy1), score_histogram(histogram, Strategy2)
+
+
+def choice_strategies() -> Iterator[type[Strategy1]]:
+    """All 27 strategies interpreting X, Y, Z as our choices."""
+    for choices in product(Choice, repeat=3):
+        file_choices = dict(zip("XYZ", choices))
+        name = f"Strategy1[{','.join(f'{code}={choice.name}' for code, choice in file_choices.items())}]"
+        yield type(name, (Strategy1,), {"FILE_CHOICES": {**Strategy1.FILE_CHOICES, **file_choices}})
+
+
+def outcome_strategies() -> Iterator[type[Strategy2]]:
+    """All 27 strategies interpreting X, Y, Z as expected results."""
+    for results in product(MatchResult, repeat=3):
+        file_results = dict(zip("XYZ", results))
+        name = f"Strategy2[{','.join(f'{code}={result.name}' for code, result in file_results.items())}]"
+        yield type(name, (Strategy2,), {"FILE_RESULTS": file_results, "RESPONSES": build_responses(file_results)})
+
+
+def search_strategies(
+    file_name: str, strategies: Iterable[type[Strategy1]] | None = None
+) -> list[tuple[type[Strategy1], int]]:
+    """
+    Scores strategies from the line histogram of the guide, so the file is read only once and every strategy costs
+    the same regardless of the guide length.
+
+    :return: strategies with player2 score, the best first
+    """
+    histogram = count_line_types(file_name)
+    if strategies is None:
+        strategies = chain(choice_strategies(), outcome_strategies())
+    scores = [(strategy, score_histogram(histogram, strategy)) for strategy in strategies]
+    return sorted(scores, key=itemgetter(1), reverse=True)
+
+
+@dataclass
+class TournamentResult:
+    strategies: list[str]
+    scores: list[list[int | None]]  # scores[i][j] is score of strategy i against strategy j, None on diagonal
+    timings: dict[tuple[int, int], float]  # seconds spent by playing pair (i, j), where i < j
+
+
+_tournament_moves: list[array] = []  # moves of all strategies, shared by worker processes
+
+
+def _init_tournament_worker(moves: list[array]) -> None:
+    global _tournament_moves
+    _tournament_moves = moves
+
+
+def _play_tournament_pair(pair: tuple[int, int]) -> tuple[int, int, int, int, float]:
+    i, j = pair
+    start = time.perf_counter()
+    game = Game()
+    game.add_player(_tournament_moves[i])
+    game.add_player(_tournament_moves[j])
+    game.play()
+    return i, j, game.score_for(player_no=1), game.score_for(player_no=2), time.perf_counter() - start
+
+
+def play_tournament(
+    file_name: str, strategies: Sequence[type[Strategy1]], workers: int | None = None
+) -> TournamentResult:
+    """
+    Plays moves of every strategy against every other one, all of them interpret the same guide.
+
+    The guide is read once and moves of every strategy are computed once, workers get them at start.
+    """
+    from concurrent.futures import ProcessPoolExecutor  # slow to import and needed only here
+
+    instructions = list(Strategy1._load_file(file_name))
+    moves = [array("b", (move for _, move in strategy.iter_rounds(instructions))) for strategy in strategies]
+    del instructions
+
+    count = len(strategies)
+    result = TournamentResult(
+        strategies=[strategy.__name__ for strategy in strategies],
+        scores=[[None] * count for _ in range(count)],
+        timings={},
+    )
+    pairs = combinations(range(count), 2)
+    with ProcessPoolExecutor(workers, initializer=_init_tournament_worker, initargs=(moves,)) as executor:
+        for i, j, score_i, score_j, seconds in executor.map(_play_tournament_pair, pairs):
+            result.scores[i][j] = score_i
+            result.scores[j][i] = score_j
+            result.timings[(i, j)] = seconds
+    return result
 
 
 class MatchResultTestCase(unittest.TestCase):
@@ -163,6 +401,12 @@ class MatchResultTestCase(unittest.TestCase):
             match_result = Game.play_match(choice, choice)
             self.assertEqual(MatchResult.DRAW, match_result, f"{choice.name} vs {choice.name}")
 
+    def test_opposite_result_is_result_of_swapped_players(self):
+        for player1 in Choice:
+            for player2 in Choice:
+                result = Game.play_match(player1, player2)
+                self.assertEqual(Game.play_match(player2, player1), result.opposite())
+
 
 class GameResultTestCase(unittest.TestCase):
     def test_play_game_without_players(self):
@@ -208,38 +452,226 @@ class GameResultTestCase(unittest.TestCase):
         game.play()
         player1_score = game.score_for(player_no=1)
         self.assertEqual(7, player1_score)
+        self.assertEqual(array("b", [MatchResult.WIN]), game.get_player(no=1).results)
         player2_score = game.score_for(player_no=2)
         self.assertEqual(3, player2_score)
 
+    def test_results_of_players_are_opposite(self):
+        game = Game()
+        game.add_player(moves=[Choice.ROCK, Choice.ROCK, Choice.PAPER])
+        game.add_player(moves=[Choice.SCISSORS, Choice.PAPER, Choice.PAPER])
+        game.play()
+        self.assertEqual(array("b", [6, 0, 3]), game.get_player(1).results)
+        self.assertEqual(array("b", [0, 6, 3]), game.get_player(2).results)
+
+    def test_players_with_different_number_of_moves_should_raise(self):
+        game = Game()
+        game.add_player(moves=[Choice.ROCK, Choice.ROCK])
+        game.add_player(moves=[Choice.SCISSORS])
+        with self.assertRaises(ValueError):
+            game.play()
+        self.assertEqual(0, len(game.get_player(1).results))
+
+    def test_score_with_and_without_numpy(self):
+        from unittest.mock import patch
+
+        game = Game()
+        game.add_player(moves=[Choice.ROCK, Choice.ROCK])
+        game.add_player(moves=[Choice.SCISSORS, Choice.PAPER])
+        game.play()
+        self.assertEqual((7 + 1, 3 + 8), (game.score_for(player_no=1), game.score_for(player_no=2)))
+        with patch.object(sys.modules[__name__], "NUMPY_MIN_VALUES", 0):
+            self.assertEqual((7 + 1, 3 + 8), (game.score_for(player_no=1), game.score_for(player_no=2)))
+            with patch.object(sys.modules[__name__], "_numpy", lambda: None):
+                self.assertEqual((7 + 1, 3 + 8), (game.score_for(player_no=1), game.score_for(player_no=2)))
+
+    def test_stream_game_keeps_only_scores(self):
+        game = Game()
+        matches_played = game.play_stream(iter([(Choice.ROCK, Choice.SCISSORS), (Choice.PAPER, Choice.SCISSORS)]))
+        self.assertEqual(2, matches_played)
+        self.assertEqual(7 + 2, game.score_for(player_no=1))
+        self.assertEqual(3 + 9, game.score_for(player_no=2))
+        self.assertEqual([], list(game.get_player(no=1).moves))
+        self.assertEqual([], list(game.get_player(no=2).results))
+
+    def test_stream_game_with_history(self):
+        game = Game()
+        game.play_stream(iter([(Choice.ROCK, Choice.SCISSORS)]), keep_history=True)
+        player1 = game.get_player(no=1)
+        self.assertEqual(([Choice.ROCK], [MatchResult.WIN]), (list(player1.moves), list(player1.results)))
+        player2 = game.get_player(no=2)
+        self.assertEqual(([Choice.SCISSORS], [MatchResult.LOSS]), (list(player2.moves), list(player2.results)))
+        self.assertEqual((7, 3), (game.score_for(player_no=1), game.score_for(player_no=2)))
+
+    def test_stream_game_with_one_player(self):
+        game = Game()
+        game.add_player([])
+        with self.assertRaises(RuntimeError):
+            game.play_stream(iter([]))
+
 
 class StrategySetUpTheGame(unittest.TestCase):
     def test_loading_strategy_instructions_from_file(self):
+        from unittest.mock import patch, mock_open
+
         with patch(f"{__name__}.open", mock_open(read_data="A X\nB Y\n")) as m:
             result = tuple(Strategy1._load_file(file_name="2.in"))
         m.assert_called_once_with("2.in", "rt")
         self.assertEqual((["A", "X"], ["B", "Y"]), result)
 
     def test_interpret_instructions_by_strategy1(self):
+        from unittest.mock import patch
+
         with patch.object(Strategy1, "_load_file", return_value=(["A", "X"], ["B", "Y"])):
             game = Strategy1.from_file(file_name="2.in")
         player1 = game.get_player(no=1)
-        self.assertEqual([Choice.ROCK, Choice.PAPER], player1.moves)
+        self.assertEqual([Choice.ROCK, Choice.PAPER], list(player1.moves))
         player2 = game.get_player(no=2)
-        self.assertEqual([Choice.ROCK, Choice.PAPER], player2.moves)
+        self.assertEqual([Choice.ROCK, Choice.PAPER], list(player2.moves))
 
     def test_interpret_instructions_by_strategy2(self):
+        from unittest.mock import patch
+
         with patch.object(Strategy2, "_load_file", return_value=(["A", "X"], ["B", "Y"], ["C", "Z"])):
             game = Strategy2.from_file(file_name="2.in")
         player1 = game.get_player(no=1)
-        self.assertEqual([Choice.ROCK, Choice.PAPER, Choice.SCISSORS], player1.moves)
+        self.assertEqual([Choice.ROCK, Choice.PAPER, Choice.SCISSORS], list(player1.moves))
         player2 = game.get_player(no=2)
-        self.assertEqual([Choice.SCISSORS, Choice.PAPER, Choice.ROCK], player2.moves)
+        self.assertEqual([Choice.SCISSORS, Choice.PAPER, Choice.ROCK], list(player2.moves))
+
+    def test_streamed_game_has_the_same_score(self):
+        from unittest.mock import patch
+
+        instructions = (["A", "X"], ["B", "Y"], ["C", "Z"], ["A", "Z"])
+        for strategy in (Strategy1, Strategy2):
+            with patch.object(strategy, "_load_file", return_value=instructions):
+                game = strategy.from_file(file_name="2.in")
+                streamed_game = strategy.play_file(file_name="2.in")
+            game.play()
+            self.assertEqual(game.score_for(player_no=2), streamed_game.score_for(player_no=2), strategy.__name__)
+
+
+def _write_test_file(test: unittest.TestCase, content: str | bytes) -> str:
+    """Writes `content` to a temporary input file removed after the test, bytes are written as they are."""
+    import tempfile
+
+    with tempfile.NamedTemporaryFile("wb" if isinstance(content, bytes) else "wt", suffix=".in", delete=False) as file:
+        file.write(content)
+    test.addCleanup(os.remove, file.name)
+    return file.name
+
+
+class LineHistogramScoringTestCase(unittest.TestCase):
+    def test_count_line_types(self):
+        histogram = count_line_types(_write_test_file(self, "A X\nB Y\nA X\nC Z"))
+        self.assertEqual(2, histogram["A X"])
+        self.assertEqual(1, histogram["B Y"])
+        self.assertEqual(1, histogram["C Z"])
+        self.assertEqual(4, sum(histogram.values()))
+
+    def test_empty_guide_has_no_score(self):
+        self.assertEqual((0, 0), score_guide(_write_test_file(self, "")))
+
+    def test_crlf_guide(self):
+        for content in (b"A Y\r\nB X\r\n", b"A Y\r\nB X"):
+            file_name = _write_test_file(self, content)
+            self.assertEqual(Strategy1.play_file(file_name).score_for(player_no=2), score_guide(file_name)[0])
+            self.assertEqual(9, score_guide(file_name)[0])
+
+    def test_malformed_guide_should_raise(self):
+        for content in ("A X\nB  Y\n", "A X\nD X\n", b"A X\r\nB Y\n"):
+            with self.assertRaises(ValueError):
+                count_line_types(_write_test_file(self, content))
+
+    def test_scores_are_the_same_as_played_game(self):
+        instructions = "A Y\nB X\nC Z\nA Z\nC Y\n"
+        file_name = _write_test_file(self, instructions)
+        expected = []
+        for strategy in (Strategy1, Strategy2):
+            game = strategy.play_file(file_name)
+            expected.append(game.score_for(player_no=2))
+        self.assertEqual(tuple(expected), score_guide(file_name))
+
+
+class AlwaysRockStrategy(Strategy1):
+    @classmethod
+    def iter_rounds(cls, instructions) -> Iterator[tuple[Choice, Choice]]:
+        for i1, _ in instructions:
+            yield cls.FILE_CHOICES[i1], Choice.ROCK
+
+
+class TournamentTestCase(unittest.TestCase):
+    def setUp(self):
+        self.file_name = _write_test_file(self, "A Y\nB X\nC Z\nA Z\n")
+
+    def test_every_pair_is_played(self):
+        strategies = (Strategy1, Strategy2, AlwaysRockStrategy)
+        result = play_tournament(self.file_name, strategies, workers=2)
+        self.assertEqual(["Strategy1", "Strategy2", "AlwaysRockStrategy"], result.strategies)
+        self.assertEqual({(0, 1), (0, 2), (1, 2)}, set(result.timings))
+        for i, strategy_i in enumerate(strategies):
+            self.assertIsNone(result.scores[i][i])
+            for j, strategy_j in enumerate(strategies[i + 1 :], start=i + 1):
+                game = Game()
+                game.add_player(move for _, move in strategy_i.iter_rounds(Strategy1._load_file(self.file_name)))
+                game.add_player(move for _, move in strategy_j.iter_rounds(Strategy1._load_file(self.file_name)))
+                game.play()
+                self.assertEqual(game.score_for(player_no=1), result.scores[i][j])
+                self.assertEqual(game.score_for(player_no=2), result.scores[j][i])
+
+    def test_one_strategy_has_no_pairs(self):
+        result = play_tournament(self.file_name, (Strategy1,), workers=1)
+        self.assertEqual([[None]], result.scores)
+        self.assertEqual({}, result.timings)
+
+
+class StrategySearchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.file_name = _write_test_file(self, "A Y\nB X\nC Z\nA Z\nB Z\n")
+
+    def test_all_mappings_are_generated(self):
+        self.assertEqual(27, len({strategy.__name__ for strategy in choice_strategies()}))
+        self.assertEqual(27, len({strategy.__name__ for strategy in outcome_strategies()}))
+
+    def test_default_mappings_are_among_candidates(self):
+        scores = dict((strategy.__name__, score) for strategy, score in search_strategies(self.file_name))
+        strategy1_score, strategy2_score = score_guide(self.file_name)
+        self.assertEqual(strategy1_score, scores["Strategy1[X=ROCK,Y=PAPER,Z=SCISSORS]"])
+        self.assertEqual(strategy2_score, scores["Strategy2[X=LOSS,Y=DRAW,Z=WIN]"])
+
+    def test_scores_are_the_same_as_played_game(self):
+        for strategy, score in search_strategies(self.file_name):
+            self.assertEqual(strategy.play_file(self.file_name).score_for(player_no=2), score, strategy.__name__)
+
+    def test_best_strategy_is_first(self):
+        results = search_strategies(self.file_name)
+        self.assertEqual(54, len(results))
+        self.assertEqual(max(score for _, score in results), results[0][1])
+        self.assertEqual("Strategy2[X=WIN,Y=WIN,Z=WIN]", results[0][0].__name__)
+
+
+def load_input(file_name: str) -> dict[str, int]:
+    """Both strategies score the same line histogram, so the guide is read only once."""
+    return count_line_types(file_name)
+
+
+def solve_part1(histogram: dict[str, int]) -> int:
+    return score_histogram(histogram, Strategy1)
+
+
+def solve_part2(histogram: dict[str, int]) -> int:
+    return score_histogram(histogram, Strategy2)
+
+
+class SolveTestCase(unittest.TestCase):
+    def test_both_parts_from_one_load(self):
+        file_name = _write_test_file(self, "A Y\nB X\nC Z\n")
+        histogram = load_input(file_name)
+        self.assertEqual(15, solve_part1(histogram))
+        self.assertEqual(12, solve_part2(histogram))
 
 
 if __name__ == "__main__":
-    game = Strategy1.from_file(file_name="2.in")
-    game.play()
-    print("Player2 score based on 1st strategy: ", game.score_for(player_no=2))
-    game2 = Strategy2.from_file(file_name="2.in")
-    game2.play()
-    print("Player2 score based on 2st strategy: ", game2.score_for(player_no=2))
+    histogram = load_input("2.in")
+    print("Player2 score based on 1st strategy: ", solve_part1(histogram))
+    print("Player2 score based on 2st strategy: ", solve_part2(histogram))
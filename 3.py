@@ -1,13 +1,99 @@
+import mmap
+import os
+import sys
 import unittest
+from dataclasses import dataclass, field
+from functools import cache
 from itertools import chain
 from string import ascii_lowercase, ascii_uppercase
-from unittest.mock import patch, mock_open
+from typing import BinaryIO, Iterable, Iterator
 
+ITEM_CHARACTERS = ascii_lowercase + ascii_uppercase
+# priority of every byte, characters which aren't items have zero priority; ITEM_BITS are built from it
+ITEM_PRIORITIES = bytes(
+    ITEM_CHARACTERS.index(chr(byte)) + 1 if chr(byte) in ITEM_CHARACTERS else 0 for byte in range(256)
+)
+# items a-z and A-Z have bits 0-51 in order of their priority, bit index + 1 is the priority of the item,
+# any other character gets its own bit above them, so we can still tell it apart
+ITEMS_MASK = (1 << len(ITEM_CHARACTERS)) - 1
+ITEM_BITS = tuple(
+    1 << (priority - 1 if priority else len(ITEM_CHARACTERS) + byte) for byte, priority in enumerate(ITEM_PRIORITIES)
+)
+CHARACTER_OF_BIT = {bit.bit_length() - 1: chr(byte) for byte, bit in enumerate(ITEM_BITS)}
 
-def find_compartment_overlap(bag: str) -> set[str]:
+
+def items_mask(items: Iterable[int]) -> int:
+    item_bits = ITEM_BITS
+    mask = 0
+    for item in items:
+        mask |= item_bits[item]
+    return mask
+
+
+def common_items(items: bytes, other: bytes) -> bytes:
+    """:return: items which are in `other` too, filtered by `translate` without any per item Python work"""
+    return items.translate(None, items.translate(None, other))
+
+
+def compartment_overlap_mask(bag: bytes) -> int:
     middle = len(bag) // 2
-    compartment1, compartment2 = set(bag[:middle]), set(bag[middle:])
-    return compartment1 & compartment2
+    # usually only a few items are shared, so we don't need to build masks of whole compartments
+    return items_mask(common_items(bag[:middle], bag[middle:]))
+
+
+def badge_mask(bag1: bytes, bag2: bytes, bag3: bytes) -> int:
+    return items_mask(common_items(common_items(bag1, bag2), bag3))
+
+
+def mask_priority(mask: int) -> int:
+    """:return: sum of priorities of all items in the mask, usually there is only one"""
+    mask &= ITEMS_MASK
+    if not mask & (mask - 1):  # zero or exactly one item
+        return mask.bit_length()
+    priority = 0
+    while mask:
+        lowest_bit = mask & -mask
+        priority += lowest_bit.bit_length()
+        mask ^= lowest_bit
+    return priority
+
+
+def mask_characters(mask: int) -> set[str]:
+    characters = set()
+    while mask:
+        lowest_bit = mask & -mask
+        characters.add(CHARACTER_OF_BIT[lowest_bit.bit_length() - 1])
+        mask ^= lowest_bit
+    return characters
+
+
+class TestItemMasks(unittest.TestCase):
+    def test_priority_is_bit_index(self):
+        self.assertEqual(1, mask_priority(items_mask(b"a")))
+        self.assertEqual(27, mask_priority(items_mask(b"A")))
+        self.assertEqual(52, mask_priority(items_mask(b"Z")))
+
+    def test_repeated_items_share_one_bit(self):
+        self.assertEqual(items_mask(b"ab"), items_mask(b"abba"))
+
+    def test_other_characters_have_no_priority(self):
+        self.assertEqual(0, mask_priority(items_mask(b"1")))
+        self.assertEqual({"1", "a"}, mask_characters(items_mask(b"1a")))
+
+    def test_compartment_overlap_mask(self):
+        self.assertEqual(16, mask_priority(compartment_overlap_mask(b"vJrwpWtwJgWrhcsFMMfFFhFp")))
+        self.assertEqual(0, compartment_overlap_mask(b""))
+
+    def test_badge_mask(self):
+        mask = badge_mask(b"vJrwpWtwJgWrhcsFMMfFFhFp", b"jqHRNqRjqzjGDLGLrsFMfFZSrLrFZsSL", b"PmmdzqPrVvPwwTWBwg")
+        self.assertEqual(18, mask_priority(mask))
+
+
+def find_compartment_overlap(bag: str) -> set[str]:
+    if not bag.isascii():  # bitmasks cover only single byte items, fall back to sets
+        middle = len(bag) // 2
+        return set(bag[:middle]) & set(bag[middle:])
+    return mask_characters(compartment_overlap_mask(bag.encode("ascii")))
 
 
 class TestCompartmentOverlap(unittest.TestCase):
@@ -24,6 +110,10 @@ class TestCompartmentOverlap(unittest.TestCase):
         self.assertEqual({"1"}, find_compartment_overlap(bag="121"))
         self.assertEqual({"1"}, find_compartment_overlap(bag="1231"))
 
+    def test_overlap_of_non_ascii_items(self):
+        self.assertEqual({"é"}, find_compartment_overlap(bag="aéjé"))
+        self.assertEqual(set(), find_compartment_overlap(bag="aé"))
+
 
 def build_item_priority_index() -> dict[str, int]:
     index = {item: priority for item, priority in zip(chain(ascii_lowercase, ascii_uppercase), range(1, 53))}
@@ -63,6 +153,8 @@ def load_bags_from_file(file_name: str) -> list[str]:
 
 class LoadBagsFromFile(unittest.TestCase):
     def test_load_bags_from_file(self):
+        from unittest.mock import patch, mock_open
+
         with patch(f"{__name__}.open", mock_open(read_data="abcbef\nBaADEaFA\nABCDEFG")) as m:
             result = load_bags_from_file(file_name="3.in")
         m.assert_called_once_with("3.in", "rt")
@@ -70,7 +162,9 @@ class LoadBagsFromFile(unittest.TestCase):
 
 
 def find_badge(bag1: str, bag2: str, bag3: str) -> set[str]:
-    return set(bag1) & set(bag2) & set(bag3)
+    if not (bag1.isascii() and bag2.isascii() and bag3.isascii()):  # fall back to sets, as above
+        return set(bag1) & set(bag2) & set(bag3)
+    return mask_characters(badge_mask(bag1.encode("ascii"), bag2.encode("ascii"), bag3.encode("ascii")))
 
 
 class TestBadgeItemOverlap(unittest.TestCase):
@@ -80,6 +174,9 @@ class TestBadgeItemOverlap(unittest.TestCase):
         )
         self.assertEqual({"r"}, result)
 
+    def test_find_overlap_of_non_ascii_bags(self):
+        self.assertEqual({"é", "a"}, find_badge(bag1="aéb", bag2="éac", bag3="dèaé"))
+
 
 def group_bags(bags):
     group = []
@@ -95,6 +192,84 @@ def scan_bags_for_badges(bags):
     return chain.from_iterable(filter(lambda overlaps: overlaps, map(lambda group: find_badge(*group), groups)))
 
 
+def sum_error_priorities(bags: Iterable[bytes]) -> int:
+    return sum(map(mask_priority, map(compartment_overlap_mask, bags)))
+
+
+def sum_badge_priorities(bags: Iterable[bytes]) -> int:
+    return sum(mask_priority(badge_mask(*group)) for group in group_bags(bags))
+
+
+@dataclass
+class BagsScan:
+    """Partial result of scanning bags, results of consecutive chunks can be merged."""
+
+    errors_priority: int = 0
+    badges_priority: int = 0
+    bags: int = 0
+    ungrouped_bags: list[str] = field(default_factory=list)  # trailing bags which don't make a whole group
+
+    def merge(self, other: "BagsScan") -> "BagsScan":
+        return BagsScan(
+            self.errors_priority + other.errors_priority,
+            self.badges_priority + other.badges_priority,
+            self.bags + other.bags,
+            self.ungrouped_bags + other.ungrouped_bags,
+        )
+
+
+def scan_bags(bags: Iterable[bytes]) -> BagsScan:
+    """Sums priorities of error items and badges in one pass over the bags."""
+    errors_priority = badges_priority = count = 0
+    group = []
+    for bag in bags:
+        count += 1
+        errors_priority += mask_priority(compartment_overlap_mask(bag))
+        group.append(bag)
+        if len(group) == 3:
+            badges_priority += mask_priority(badge_mask(*group))
+            group = []
+    return BagsScan(errors_priority, badges_priority, count, [bag.decode() for bag in group])
+
+
+def scan_bags_file(file_name: str) -> BagsScan:
+    with open(file_name, "rb") as file:
+        return scan_bags(line.rstrip(b"\r\n") for line in file)
+
+
+class TestPrioritySums(unittest.TestCase):
+    bags = [
+        b"vJrwpWtwJgWrhcsFMMfFFhFp",
+        b"jqHRNqRjqzjGDLGLrsFMfFZSrLrFZsSL",
+        b"PmmdzqPrVvPwwTWBwg",
+        b"wMqvLMZHhHMvwLHjbvcjnnSBnvTQFn",
+        b"ttgJtRGJQctTZtZT",
+        b"CrZsJsPPZsGzwwsLwLmpwMDw",
+    ]
+
+    def test_sum_error_priorities(self):
+        self.assertEqual(157, sum_error_priorities(self.bags))
+
+    def test_sum_badge_priorities(self):
+        self.assertEqual(70, sum_badge_priorities(self.bags))
+
+    def test_sums_are_the_same_as_sets(self):
+        index = build_item_priority_index()
+        bags = [bag.decode() for bag in self.bags]
+        self.assertEqual(sum(map(index.get, scan_bags_for_errors(bags))), sum_error_priorities(self.bags))
+        self.assertEqual(sum(map(index.get, scan_bags_for_badges(bags))), sum_badge_priorities(self.bags))
+
+    def test_item_priorities_are_the_same_as_index(self):
+        for item, priority in build_item_priority_index().items():
+            self.assertEqual(priority, mask_priority(ITEM_BITS[ord(item)]))
+        self.assertEqual(0, sum(ITEM_PRIORITIES[byte] for byte in b"1 -"))
+
+    def test_scan_bags_in_one_pass(self):
+        result = scan_bags(self.bags + [b"abcbd"])
+        self.assertEqual((157 + 2, 70, 7), (result.errors_priority, result.badges_priority, result.bags))
+        self.assertEqual(["abcbd"], result.ungrouped_bags)
+
+
 class TEstScanBagsForBadges(unittest.TestCase):
     def test_no_bags(self):
         self.assertEqual([], list(scan_bags_for_badges(bags=[])))
@@ -128,9 +303,317 @@ class TEstScanBagsForBadges(unittest.TestCase):
         self.assertEqual(["r", "r"], result)
 
 
+@cache
+def _numpy():
+    """numpy is optional and slow to import, so it's imported on the first use only."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@cache
+def _numpy_item_bits() -> "np.ndarray":
+    np = _numpy()
+    return np.array([bit if bit & ITEMS_MASK else 0 for bit in ITEM_BITS], dtype=np.uint64)
+
+
+def numpy_scan_bags(file_name: str) -> tuple[int, int]:
+    """
+    Scans all bags of the file at once.
+
+    :return: sum of error items priorities and sum of badge items priorities
+    """
+    np = _numpy()
+    if np is None:
+        raise ImportError("numpy_scan_bags needs numpy, which is not installed")
+    with open(file_name, "rb") as file:
+        data = file.read()
+    if not data:
+        return 0, 0
+    if not data.endswith(b"\n"):  # last line without newline character
+        data += b"\n"
+
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(buffer == ord("\n"))
+    starts = np.concatenate(([0], newlines[:-1] + 1))
+    ends = newlines - ((newlines > starts) & (buffer[newlines - 1] == ord("\r")))  # "\r" belongs to the line ending
+    middles = starts + (ends - starts) // 2
+    bits = _numpy_item_bits()[buffer]
+
+    # OR over the first compartment, and over the second one together with its line ending, which has no bit
+    compartments = np.bitwise_or.reduceat(bits, np.column_stack((starts, middles)).ravel())
+    compartment1, compartment2 = compartments[0::2], compartments[1::2]
+    compartment1[starts == middles] = 0  # reduceat gives first item of an empty segment instead of nothing
+    errors = compartment1 & compartment2
+
+    groups = len(newlines) // 3
+    bags = (compartment1 | compartment2)[: groups * 3].reshape(groups, 3)
+    badges = np.bitwise_and.reduce(bags, axis=1)
+    return _numpy_masks_priority(errors), _numpy_masks_priority(badges)
+
+
+def _numpy_masks_priority(masks: "np.ndarray") -> int:
+    np = _numpy()
+    return sum(int(np.count_nonzero((masks >> np.uint64(bit)) & np.uint64(1))) * (bit + 1) for bit in range(52))
+
+
+def _write_test_file(test: unittest.TestCase, content: str | bytes) -> str:
+    """Writes `content` to a temporary input file removed after the test, bytes are written as they are."""
+    import tempfile
+
+    with tempfile.NamedTemporaryFile("wb" if isinstance(content, bytes) else "wt", suffix=".in", delete=False) as file:
+        file.write(content)
+    test.addCleanup(os.remove, file.name)
+    return file.name
+
+
+class TestNumpyScanBags(unittest.TestCase):
+    def setUp(self):
+        if _numpy() is None:
+            self.skipTest("numpy is not installed")
+
+    def test_results_are_the_same_as_sets(self):
+        index = build_item_priority_index()
+        contents = (
+            "",
+            "vJrwpWtwJgWrhcsFMMfFFhFp\njqHRNqRjqzjGDLGLrsFMfFZSrLrFZsSL\nPmmdzqPrVvPwwTWBwg\n",
+            "abcbd\nBaADEaFA\n\na\nabcab\nZaZ",
+            "aa\naAbBcCaA\nbcab\nxyz\nxXyx\naxa\n",
+            b"abb\r\nxyz\r\nbyq\r\n",
+            b"abcbd\r\nBaADEaFA\r\n\r\na\r\nabcab\r\nZaZ",
+        )
+        for content in contents:
+            bags = (content.decode() if isinstance(content, bytes) else content).splitlines()
+            expected = sum(map(index.get, scan_bags_for_errors(bags))), sum(map(index.get, scan_bags_for_badges(bags)))
+            self.assertEqual(expected, numpy_scan_bags(_write_test_file(self, content)), repr(content))
+
+    def test_missing_numpy_should_raise(self):
+        from unittest.mock import patch
+
+        with patch.object(sys.modules[__name__], "_numpy", lambda: None), self.assertRaises(ImportError):
+            numpy_scan_bags(_write_test_file(self, "abcbd\n"))
+
+
+CHUNK_SIZE = 1 << 16
+
+
+def _find_line_start(file: BinaryIO, position: int, lines: int, target: int) -> tuple[int, int]:
+    """
+    Moves from the start of line number `lines` at `position` to the first line starting at `target` or later.
+
+    :return: position and number of the found line
+    """
+    file.seek(position)
+    while position < target and (block := file.read(min(CHUNK_SIZE, target - position))):
+        lines += block.count(b"\n")
+        position += len(block)
+    if 0 < position == target:
+        file.seek(target - 1)
+        if file.read(1) != b"\n":  # we are in the middle of the line
+            rest = file.readline()
+            position, lines = target + len(rest), lines + 1
+    return position, lines
+
+
+def split_bags_file(file_name: str, chunks: int) -> list[tuple[int, int]]:
+    """Splits file to byte ranges `[start, stop)`, every range except the last one holds whole groups of bags."""
+    size = os.path.getsize(file_name)
+    boundaries = [0]
+    position = lines = 0
+    with open(file_name, "rb") as file:
+        for chunk in range(1, chunks):
+            position, lines = _find_line_start(file, position, lines, max(size * chunk // chunks, position))
+            file.seek(position)
+            while lines % 3 and (line := file.readline()):  # move to the start of the next group
+                position, lines = position + len(line), lines + 1
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _iter_range_bags(file_name: str, start: int, stop: int) -> Iterator[bytes]:
+    with open(file_name, "rb") as file:
+        file.seek(start)
+        while start < stop and (line := file.readline()):
+            start += len(line)
+            yield line.rstrip(b"\r\n")
+
+
+def scan_bags_range(file_name: str, start: int, stop: int) -> BagsScan:
+    return scan_bags(_iter_range_bags(file_name, start, stop))
+
+
+def parallel_scan_bags(file_name: str, workers: int | None = None) -> BagsScan:
+    """Scans chunks of the file in a process pool and merges their partial results."""
+    from concurrent.futures import ProcessPoolExecutor  # slow to import and needed only here
+
+    workers = workers or os.cpu_count() or 1
+    result = BagsScan()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(scan_bags_range, file_name, start, stop)
+            for start, stop in split_bags_file(file_name, workers)
+        ]
+        for future in futures:
+            result = result.merge(future.result())
+    return result
+
+
+class TestParallelScanBags(unittest.TestCase):
+    bags = [
+        "vJrwpWtwJgWrhcsFMMfFFhFp",
+        "jqHRNqRjqzjGDLGLrsFMfFZSrLrFZsSL",
+        "PmmdzqPrVvPwwTWBwg",
+        "wMqvLMZHhHMvwLHjbvcjnnSBnvTQFn",
+        "ttgJtRGJQctTZtZT",
+        "CrZsJsPPZsGzwwsLwLmpwMDw",
+        "abcbd",
+        "BaADEaFA",
+    ]
+
+    def setUp(self):
+        self.file_name = _write_test_file(self, "\n".join(self.bags * 3))
+
+    def test_chunks_hold_whole_groups(self):
+        with open(self.file_name, "rb") as file:
+            content = file.read()
+        for chunks in range(1, 30):
+            ranges = split_bags_file(self.file_name, chunks)
+            self.assertEqual(0, ranges[0][0])
+            self.assertEqual(len(content), ranges[-1][1])
+            for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(stop, start)
+                self.assertEqual(0, content[:start].count(b"\n") % 3)
+                self.assertEqual(b"\n", content[start - 1 : start])
+
+    def test_parallel_scan_is_the_same_as_sequential(self):
+        index = build_item_priority_index()
+        bags = self.bags * 3
+        result = parallel_scan_bags(self.file_name, workers=3)
+        self.assertEqual(sum(map(index.get, scan_bags_for_errors(bags))), result.errors_priority)
+        self.assertEqual(sum(map(index.get, scan_bags_for_badges(bags))), result.badges_priority)
+        self.assertEqual(24, result.bags)
+
+    def test_ungrouped_bags_are_reported(self):
+        self.assertEqual([], parallel_scan_bags(self.file_name, workers=2).ungrouped_bags)
+        with open(self.file_name, "at") as file:
+            file.write("\nabcbd\nBaADEaFA\n")
+        result = parallel_scan_bags(self.file_name, workers=4)
+        self.assertEqual(26, result.bags)
+        self.assertEqual(["abcbd", "BaADEaFA"], result.ungrouped_bags)
+
+
+def iter_bag_lines(data: mmap.mmap) -> Iterator[tuple[int, int]]:
+    """:return: start and stop offsets of every line in the mapped file, without the newline characters"""
+    start = 0
+    size = len(data)
+    while start < size:
+        stop = data.find(b"\n", start)
+        next_start = stop + 1 if stop >= 0 else size
+        stop = stop if stop >= 0 else size
+        if stop > start and data[stop - 1] == ord("\r"):
+            stop -= 1
+        yield start, stop
+        start = next_start
+
+
+def range_items_mask(data: mmap.mmap, start: int, stop: int) -> int:
+    """Mask of items a-z and A-Z in `data[start:stop]`, read once in place by windows of `CHUNK_SIZE` bytes."""
+    seen = bytearray()
+    with memoryview(data) as view:
+        for window_start in range(start, stop, CHUNK_SIZE):
+            # bytes seen in previous windows are deleted in one pass, new ones are deleted one by one
+            window = bytes(view[window_start : min(window_start + CHUNK_SIZE, stop)]).translate(None, seen)
+            while window:
+                seen.append(window[0])
+                window = window.translate(None, window[:1])
+    return items_mask(seen) & ITEMS_MASK
+
+
+UNGROUPED_BAG_PREFIX_SIZE = 80
+
+
+def scan_long_bags_file(file_name: str) -> BagsScan:
+    """
+    Scans bags of any length with constant memory per bag, intended for files with very long lines.
+
+    Only items a-z and A-Z are taken into account, trailing ungrouped bags are returned as their first
+    `UNGROUPED_BAG_PREFIX_SIZE` characters only.
+    """
+    if not os.path.getsize(file_name):
+        return BagsScan()
+    errors_priority = badges_priority = count = 0
+    group = []
+    with open(file_name, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for start, stop in iter_bag_lines(data):
+            count += 1
+            middle = start + (stop - start) // 2
+            compartment1, compartment2 = range_items_mask(data, start, middle), range_items_mask(data, middle, stop)
+            errors_priority += mask_priority(compartment1 & compartment2)
+            group.append((start, stop, compartment1 | compartment2))
+            if len(group) == 3:
+                badges_priority += mask_priority(group[0][2] & group[1][2] & group[2][2])
+                group = []
+        ungrouped_bags = [
+            data[start : min(stop, start + UNGROUPED_BAG_PREFIX_SIZE)].decode() for start, stop, _ in group
+        ]
+    return BagsScan(errors_priority, badges_priority, count, ungrouped_bags)
+
+
+class TestScanLongBags(unittest.TestCase):
+    def test_results_are_the_same_as_scan_bags(self):
+        contents = (
+            "",
+            "vJrwpWtwJgWrhcsFMMfFFhFp\njqHRNqRjqzjGDLGLrsFMfFZSrLrFZsSL\nPmmdzqPrVvPwwTWBwg\n",
+            "abcbd\r\nBaADEaFA\r\n\r\na\nabcab\nZaZ",
+        )
+        for content in contents:
+            file_name = _write_test_file(self, content)
+            self.assertEqual(scan_bags_file(file_name), scan_long_bags_file(file_name), repr(content))
+
+    def test_long_bags(self):
+        bags = ["ab" * 100_000 + "Z" + "cd" * 100_000 + "Z", "x" * 300_000 + "Z", "Z" + "y" * 500_000]
+        file_name = _write_test_file(self, "\n".join(bags))
+        result = scan_long_bags_file(file_name)
+        self.assertEqual(52 + 24 + 25, result.errors_priority)  # Z, x and y
+        self.assertEqual(52, result.badges_priority)
+        self.assertEqual(scan_bags(bag.encode() for bag in bags), result)
+
+    def test_long_ungrouped_bags_are_reported_by_prefix(self):
+        bags = ["abcbd", "x" * 300_000 + "Z", "Z" + "y" * 500_000]
+        result = scan_long_bags_file(_write_test_file(self, "\n".join(bags * 2 + bags[:2])))
+        self.assertEqual(8, result.bags)
+        self.assertEqual(["abcbd", "x" * UNGROUPED_BAG_PREFIX_SIZE], result.ungrouped_bags)
+
+
+def load_input(file_name: str) -> BagsScan:
+    """Single pass over the input, both parts are answered from its result."""
+    return scan_bags_file(file_name)
+
+
+def solve_part1(scan: BagsScan) -> int:
+    return scan.errors_priority
+
+
+def solve_part2(scan: BagsScan) -> int:
+    return scan.badges_priority
+
+
+class SolveTestCase(unittest.TestCase):
+    def test_both_parts_from_one_load(self):
+        file_name = _write_test_file(
+            self, "vJrwpWtwJgWrhcsFMMfFFhFp\njqHRNqRjqzjGDLGLrsFMfFZSrLrFZsSL\nPmmdzqPrVvPwwTWBwg\n"
+        )
+        scan = load_input(file_name)
+        self.assertEqual(16 + 38 + 42, solve_part1(scan))
+        self.assertEqual(18, solve_part2(scan))
+
+
 if __name__ == "__main__":
-    index = build_item_priority_index()
-    error_items_priorities_sum = sum(map(lambda i: index[i], scan_bags_for_errors(load_bags_from_file("3.in"))))
-    print("Sum of error items priorities is: ", error_items_priorities_sum)
-    badge_items_prioriteis_sum = sum(map(lambda i: index[i], scan_bags_for_badges(load_bags_from_file("3.in"))))
-    print("Sum of badge items priorities in: ", badge_items_prioriteis_sum)
+    scan = load_input("3.in")
+    print("Sum of error items priorities is: ", solve_part1(scan))
+    print("Sum of badge items priorities in: ", solve_part2(scan))
@@ -1,13 +1,66 @@
-from dataclasses import dataclass
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, FrozenInstanceError
+from functools import cache
+from itertools import combinations, takewhile
+from operator import and_, attrgetter, le, or_
+from typing import Iterable, Sequence
+import os
+import sys
 import unittest
-from unittest.mock import patch, mock_open
 
 
-@dataclass
+@cache
+def _numpy():
+    """numpy speeds up counting, but it's optional and slow to import, so it's imported on the first use only."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# bulk comparisons of range columns, they run through `map` with operator functions, without any Python frame per pair
+def _either_contains(start1: Sequence[int], stop1: Sequence[int], start2: Sequence[int], stop2: Sequence[int]):
+    first_contains = map(and_, map(le, start1, start2), map(le, stop2, stop1))
+    second_contains = map(and_, map(le, start2, start1), map(le, stop1, stop2))
+    return map(or_, first_contains, second_contains)
+
+
+def _intersect(start1: Sequence[int], stop1: Sequence[int], start2: Sequence[int], stop2: Sequence[int]):
+    return map(and_, map(le, start1, stop2), map(le, start2, stop1))
+
+
+@dataclass(frozen=True, slots=True)
 class SectionRange:
     start: int  # included
     stop: int  # included
 
+    @staticmethod
+    def _columns(ranges1: Sequence["SectionRange"], ranges2: Sequence["SectionRange"]):
+        if len(ranges1) != len(ranges2):
+            raise ValueError("We can compare only sequences of the same length!")
+        starts, stops = attrgetter("start"), attrgetter("stop")
+        return tuple(list(map(getter, ranges)) for ranges in (ranges1, ranges2) for getter in (starts, stops))
+
+    @classmethod
+    def either_contains_mask(cls, ranges1: Sequence["SectionRange"], ranges2: Sequence["SectionRange"]) -> list[bool]:
+        """:return: for every i, whether `ranges1[i]` contains `ranges2[i]` or the other way around"""
+        return list(_either_contains(*cls._columns(ranges1, ranges2)))
+
+    @classmethod
+    def intersect_mask(cls, ranges1: Sequence["SectionRange"], ranges2: Sequence["SectionRange"]) -> list[bool]:
+        """:return: for every i, whether `ranges1[i]` intersects `ranges2[i]`"""
+        return list(_intersect(*cls._columns(ranges1, ranges2)))
+
+    @classmethod
+    def count_either_contains(cls, ranges1: Sequence["SectionRange"], ranges2: Sequence["SectionRange"]) -> int:
+        return sum(_either_contains(*cls._columns(ranges1, ranges2)))
+
+    @classmethod
+    def count_intersecting(cls, ranges1: Sequence["SectionRange"], ranges2: Sequence["SectionRange"]) -> int:
+        return sum(_intersect(*cls._columns(ranges1, ranges2)))
+
     def __contains__(self, item: "SectionRange") -> bool:
         is_in = (item.start >= self.start) and (item.stop <= self.stop)
         return is_in
@@ -98,6 +151,42 @@ class TestIntersectionOperator(unittest.TestCase):
         self.assertTrue(result)
 
 
+class TestSectionRangeRepresentation(unittest.TestCase):
+    def test_equal_ranges_have_equal_hash(self):
+        self.assertEqual(
+            {SectionRange(1, 2), SectionRange(3, 4)}, {SectionRange(1, 2), SectionRange(3, 4), SectionRange(1, 2)}
+        )
+
+    def test_range_is_immutable(self):
+        section = SectionRange(1, 2)
+        with self.assertRaises(FrozenInstanceError):
+            section.start = 3
+
+    def test_range_has_no_dict(self):
+        self.assertFalse(hasattr(SectionRange(1, 2), "__dict__"))
+
+
+class TestBulkComparison(unittest.TestCase):
+    ranges1 = [SectionRange(2, 4), SectionRange(2, 3), SectionRange(5, 7), SectionRange(2, 8), SectionRange(6, 6)]
+    ranges2 = [SectionRange(6, 8), SectionRange(4, 5), SectionRange(7, 9), SectionRange(3, 7), SectionRange(4, 6)]
+
+    def test_masks_are_the_same_as_operators(self):
+        pairs = list(zip(self.ranges1, self.ranges2))
+        self.assertEqual(
+            [(r1 in r2) or (r2 in r1) for r1, r2 in pairs],
+            SectionRange.either_contains_mask(self.ranges1, self.ranges2),
+        )
+        self.assertEqual([r1 & r2 for r1, r2 in pairs], SectionRange.intersect_mask(self.ranges1, self.ranges2))
+
+    def test_counts(self):
+        self.assertEqual(2, SectionRange.count_either_contains(self.ranges1, self.ranges2))
+        self.assertEqual(3, SectionRange.count_intersecting(self.ranges1, self.ranges2))
+
+    def test_sequences_of_different_length_should_raise(self):
+        with self.assertRaises(ValueError):
+            SectionRange.intersect_mask(self.ranges1, self.ranges2[1:])
+
+
 def load_section_ranges_from_file(file_name: str) -> list[tuple[SectionRange, SectionRange]]:
     lines = None
     with open(file_name, "rt") as file:
@@ -113,6 +202,8 @@ def load_section_ranges_from_file(file_name: str) -> list[tuple[SectionRange, Se
 
 class TestLoadingSectionRangesFromFile(unittest.TestCase):
     def test_load_a_range_pair(self):
+        from unittest.mock import patch, mock_open
+
         with patch(f"{__name__}.open", mock_open(read_data="2-4,6-8\n2-3,4-5")) as m:
             result = load_section_ranges_from_file(file_name="4.in")
         m.assert_called_once_with("4.in", "rt")
@@ -120,8 +211,261 @@ class TestLoadingSectionRangesFromFile(unittest.TestCase):
         self.assertListEqual(expected_result, result)
 
 
+@dataclass
+class SectionColumns:
+    """Pairs of section ranges stored column-wise, i-th pair is `(start1[i]-stop1[i], start2[i]-stop2[i])`."""
+
+    start1: array
+    stop1: array
+    start2: array
+    stop2: array
+
+    SEPARATORS = str.maketrans("-,", "  ")
+    # deletes everything but separators and line breaks, so a valid line becomes "-,-"
+    LINE_LAYOUT = str.maketrans("", "", "0123456789 \t\r")
+    NUMPY_MIN_PAIRS = 100_000  # below it, importing numpy costs more than it saves
+
+    @classmethod
+    def from_string(cls, input: str) -> "SectionColumns":
+        values = array("q", map(int, input.translate(cls.SEPARATORS).split()))
+        layout = input.translate(cls.LINE_LAYOUT).split()
+        if len(values) != 4 * len(layout) or layout.count("-,-") != len(layout):
+            raise ValueError("Every line has to contain a pair of ranges in format 'a-b,c-d'!")
+        return cls(values[0::4], values[1::4], values[2::4], values[3::4])
+
+    @classmethod
+    def from_file(cls, file_name: str) -> "SectionColumns":
+        with open(file_name, "rt") as file:
+            return cls.from_string(file.read())
+
+    def __len__(self) -> int:
+        return len(self.start1)
+
+    def __getitem__(self, index: int) -> tuple[SectionRange, SectionRange]:
+        return (
+            SectionRange(self.start1[index], self.stop1[index]),
+            SectionRange(self.start2[index], self.stop2[index]),
+        )
+
+    def count_containing(self) -> int:
+        """Counts pairs where one range contains the other."""
+        np = _numpy() if len(self) >= self.NUMPY_MIN_PAIRS else None
+        if np is not None:
+            start1, stop1, start2, stop2 = self._numpy_columns(np)
+            return int(
+                np.count_nonzero(((start1 <= start2) & (stop2 <= stop1)) | ((start2 <= start1) & (stop1 <= stop2)))
+            )
+        return sum(_either_contains(self.start1, self.stop1, self.start2, self.stop2))
+
+    def count_intersecting(self) -> int:
+        """Counts pairs where ranges intersect."""
+        np = _numpy() if len(self) >= self.NUMPY_MIN_PAIRS else None
+        if np is not None:
+            start1, stop1, start2, stop2 = self._numpy_columns(np)
+            return int(np.count_nonzero((start1 <= stop2) & (start2 <= stop1)))
+        return sum(_intersect(self.start1, self.stop1, self.start2, self.stop2))
+
+    def _numpy_columns(self, np) -> tuple["np.ndarray", ...]:
+        # views of the arrays, nothing is copied
+        return tuple(
+            np.frombuffer(column, dtype=np.int64) for column in (self.start1, self.stop1, self.start2, self.stop2)
+        )
+
+
+class TestSectionColumns(unittest.TestCase):
+    input = "2-4,6-8\n2-3,4-5\n5-7,7-9\n2-8,3-7\n6-6,4-6\n2-6,4-8\n"
+
+    def test_columns_are_parsed(self):
+        columns = SectionColumns.from_string(self.input)
+        self.assertEqual(6, len(columns))
+        self.assertEqual(array("q", [2, 2, 5, 2, 6, 2]), columns.start1)
+        self.assertEqual(array("q", [8, 5, 9, 7, 6, 8]), columns.stop2)
+        self.assertEqual((SectionRange(2, 8), SectionRange(3, 7)), columns[3])
+
+    def test_malformed_line_should_raise(self):
+        with self.assertRaises(ValueError):
+            SectionColumns.from_string("2-4,6-8\n2-3,4\n")
+
+    def test_wrong_separators_should_raise(self):
+        for input in ("1-2-3-4", "1 2 3 4", "1,2,3,4", "1-2,3\n4-5,6-7-8", "1-2,3-4 5-6,7-8", "1-2,3-4 5"):
+            with self.assertRaises(ValueError, msg=repr(input)):
+                SectionColumns.from_string(input)
+
+    def test_blank_lines_and_crlf_are_allowed(self):
+        columns = SectionColumns.from_string("2-4,6-8\r\n\r\n2-3, 4-5\r\n")
+        self.assertEqual((SectionRange(2, 3), SectionRange(4, 5)), columns[1])
+
+    def test_counts_are_the_same_as_section_ranges(self):
+        columns = SectionColumns.from_string(self.input)
+        pairs = [columns[i] for i in range(len(columns))]
+        self.assertEqual(sum(map(lambda r: (r[0] in r[1]) or (r[1] in r[0]), pairs)), columns.count_containing())
+        self.assertEqual(sum(map(lambda r: r[0] & r[1], pairs)), columns.count_intersecting())
+        self.assertEqual((2, 4), (columns.count_containing(), columns.count_intersecting()))
+
+    def test_counts_with_and_without_numpy(self):
+        from unittest.mock import patch
+
+        columns = SectionColumns.from_string(self.input)
+        with patch.object(SectionColumns, "NUMPY_MIN_PAIRS", 0):
+            self.assertEqual((2, 4), (columns.count_containing(), columns.count_intersecting()))
+            with patch.object(sys.modules[__name__], "_numpy", lambda: None):
+                self.assertEqual((2, 4), (columns.count_containing(), columns.count_intersecting()))
+
+
+@dataclass(slots=True)
+class _IntervalNode:
+    center: int
+    by_start: list[tuple[int, int]]  # (start, id) of ranges containing the center, sorted by start
+    by_stop: list[tuple[int, int]]  # (stop, id) of ranges containing the center, sorted by stop descending
+    left: "_IntervalNode | None"  # ranges ending before the center
+    right: "_IntervalNode | None"  # ranges starting after the center
+
+
+class SectionIndex:
+    """Centered interval tree over section ranges of the whole roster, ranges are identified by their position."""
+
+    def __init__(self, ranges: Sequence[SectionRange]):
+        self._ranges = list(ranges)
+        self._root = self._build(list(range(len(self._ranges))))
+        self._sorted_stops = sorted(section.stop for section in self._ranges)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[tuple[SectionRange, SectionRange]]) -> "SectionIndex":
+        """Index of all assignments, the first range of pair `i` gets id `2 * i` and the second one `2 * i + 1`."""
+        return cls([section for pair in pairs for section in pair])
+
+    def _build(self, ids: list[int]) -> _IntervalNode | None:
+        if not ids:
+            return None
+        starts = sorted(self._ranges[i].start for i in ids)
+        center = starts[len(starts) // 2]  # range with the median start contains the center, so we always progress
+        here, left, right = [], [], []
+        for i in ids:
+            section = self._ranges[i]
+            if section.stop < center:
+                left.append(i)
+            elif section.start > center:
+                right.append(i)
+            else:
+                here.append(i)
+        return _IntervalNode(
+            center,
+            sorted((self._ranges[i].start, i) for i in here),
+            sorted(((self._ranges[i].stop, i) for i in here), reverse=True),
+            self._build(left),
+            self._build(right),
+        )
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __getitem__(self, id: int) -> SectionRange:
+        return self._ranges[id]
+
+    def overlapping(self, section: SectionRange) -> list[int]:
+        """:return: sorted ids of ranges intersecting the section"""
+        found = []
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            if node is None:
+                continue
+            if section.stop < node.center:
+                found.extend(takewhile(lambda item: item[0] <= section.stop, node.by_start))
+                nodes.append(node.left)
+            elif section.start > node.center:
+                found.extend(takewhile(lambda item: item[0] >= section.start, node.by_stop))
+                nodes.append(node.right)
+            else:
+                found.extend(node.by_start)
+                nodes.append(node.left)
+                nodes.append(node.right)
+        return sorted(i for _, i in found)
+
+    def containing(self, section: int) -> list[int]:
+        """:return: sorted ids of ranges containing the section"""
+        return self.overlapping(SectionRange(section, section))
+
+    def count_overlapping_pairs(self) -> int:
+        """Counts all intersecting pairs of ranges, as all pairs minus the disjoint ones."""
+        count = len(self._ranges)
+        # every disjoint pair is counted exactly once, for the range starting after the other one stops
+        disjoint = sum(bisect_left(self._sorted_stops, section.start) for section in self._ranges)
+        return count * (count - 1) // 2 - disjoint
+
+
+class TestSectionIndex(unittest.TestCase):
+    def setUp(self):
+        import random
+
+        rng = random.Random(4)
+        self.ranges = []
+        for _ in range(200):
+            start = rng.randint(1, 100)
+            self.ranges.append(SectionRange(start, start + rng.randint(0, 15)))
+        self.index = SectionIndex(self.ranges)
+
+    def test_overlapping_ranges(self):
+        for query in (SectionRange(1, 1), SectionRange(10, 20), SectionRange(50, 50), SectionRange(0, 200)):
+            expected = [i for i, section in enumerate(self.ranges) if section & query]
+            self.assertEqual(expected, self.index.overlapping(query), query)
+
+    def test_containing_section(self):
+        for section in (0, 1, 37, 115, 116):
+            expected = [i for i, r in enumerate(self.ranges) if r.start <= section <= r.stop]
+            self.assertEqual(expected, self.index.containing(section), section)
+
+    def test_count_overlapping_pairs(self):
+        expected = sum(a & b for a, b in combinations(self.ranges, 2))
+        self.assertEqual(expected, self.index.count_overlapping_pairs())
+
+    def test_empty_index(self):
+        index = SectionIndex([])
+        self.assertEqual([], index.overlapping(SectionRange(1, 2)))
+        self.assertEqual(0, index.count_overlapping_pairs())
+
+    def test_index_of_pairs(self):
+        index = SectionIndex.from_pairs(
+            [(SectionRange(2, 4), SectionRange(6, 8)), (SectionRange(2, 3), SectionRange(4, 5))]
+        )
+        self.assertEqual([0, 3], index.containing(4))
+        self.assertEqual(SectionRange(4, 5), index[3])
+        self.assertEqual(2, index.count_overlapping_pairs())
+
+
+def load_input(file_name: str) -> SectionColumns:
+    return SectionColumns.from_file(file_name)
+
+
+def solve_part1(columns: SectionColumns) -> int:
+    return columns.count_containing()
+
+
+def solve_part2(columns: SectionColumns) -> int:
+    return columns.count_intersecting()
+
+
+def _write_test_file(test: unittest.TestCase, content: str | bytes) -> str:
+    """Writes `content` to a temporary input file removed after the test, bytes are written as they are."""
+    import tempfile
+
+    with tempfile.NamedTemporaryFile("wb" if isinstance(content, bytes) else "wt", suffix=".in", delete=False) as file:
+        file.write(content)
+    test.addCleanup(os.remove, file.name)
+    return file.name
+
+
+class SolveTestCase(unittest.TestCase):
+    def test_both_parts_from_one_load(self):
+        import os
+
+        file_name = _write_test_file(self, "2-4,6-8\n2-8,3-7\n5-7,7-9\n")
+        columns = load_input(file_name)
+        self.assertEqual(1, solve_part1(columns))
+        self.assertEqual(2, solve_part2(columns))
+
+
 if __name__ == "__main__":
-    containing_pairs = sum(map(lambda r: (r[0] in r[1]) or (r[1] in r[0]), load_section_ranges_from_file("4.in")))
-    print("Sum of containing pairs: ", containing_pairs)
-    intersecting_pairs = sum(map(lambda r: r[0] & r[1], load_section_ranges_from_file("4.in")))
-    print("Sum of intersecting pairs: ", intersecting_pairs)
+    columns = load_input("4.in")
+    print("Sum of containing pairs: ", solve_part1(columns))
+    print("Sum of intersecting pairs: ", solve_part2(columns))
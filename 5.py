@@ -1,45 +1,146 @@
+import os
 import unittest
 from collections import deque
+from collections.abc import Sequence
 from copy import deepcopy
-from dataclasses import dataclass
-from itertools import islice
+from dataclasses import dataclass, field
+from itertools import repeat, starmap
+from typing import Iterable, Iterator, NamedTuple, TextIO
+
+
+class StackView(Sequence):
+    """Read-only view of a stack, stacks may be shared with snapshots, so they are changed only by `move_crates`."""
+
+    __slots__ = ("_stack",)
+
+    def __init__(self, stack: deque[str]):
+        self._stack = stack
+
+    def __len__(self) -> int:
+        return len(self._stack)
+
+    def __getitem__(self, index: int) -> str:
+        return self._stack[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._stack)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, StackView):
+            return self._stack == other._stack
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"StackView({list(self._stack)!r})"
 
 
 @dataclass(slots=True)
 class StacksArea:
-    _stacks: tuple[deque[str]]
+    _stacks: tuple[deque[str]]  # the top crate of a stack is at index 0
+    # stacks are shared with snapshots until they are changed (copy-on-write), these are ours only
+    _owned: set[int] = field(default_factory=set, repr=False)
+    _hashes: list[int | None] = field(default_factory=list, repr=False)  # cached, None when the stack has changed
 
-    @staticmethod
-    def _iter_stacks(iterable):
-        it = iter(iterable)
-        # we have 3 characters representing stack space plus 1 empty space between stacks
-        while batch := list(islice(it, 4)):
-            yield batch[:3]
+    def __post_init__(self):
+        self._stacks = tuple(stack if isinstance(stack, deque) else deque(stack) for stack in self._stacks)
+        self._owned = set(range(len(self._stacks)))
+        self._hashes = [None] * len(self._stacks)
+
+    @classmethod
+    def from_lines(cls, lines: Iterator[str]) -> "StacksArea":
+        """
+        Reads the drawing until the row with stack numbers, the rest of the lines is left in the iterator.
+        """
+        rows = []
+        labels = ""
+        for line in lines:
+            line = line.rstrip("\n")
+            if not line:  # drawing without stack numbers, commands follow
+                break
+            if line.lstrip()[:1].isdigit():
+                labels = line
+                break
+            # crate marks are at fixed positions 1, 5, 9, ..., as every stack takes 3 characters plus 1 space
+            rows.append(line[1::4])
+
+        count = max(len(labels.split()), max(map(len, rows), default=0))
+        # rows are transposed to stacks, the top crate first, empty spots are dropped
+        columns = zip(*(row.ljust(count) for row in rows)) if rows else repeat((), count)
+        return cls(tuple(deque("".join(column).replace(" ", "")) for column in columns))
 
     @classmethod
     def from_string(cls, input: str) -> "StacksArea":
-        if not input:
-            return StacksArea(tuple())
-
-        stacks = []
-        for line in input.splitlines():
-            for i, crate in enumerate(cls._iter_stacks(line)):
-                match tuple(crate):
-                    case " ", " ", " ":  # empty spot, but we expect stack here
-                        if len(stacks) <= i:  # we will initialise stack with a deque
-                            stacks.append(deque())
-                    case "[", crate_mark, "]":  # we have a crate
-                        if len(stacks) <= i:  # we will initialise stack with a deque
-                            stacks.append(deque())
-                        stacks[i].append(crate_mark)
-        return cls(tuple(stacks))
+        return cls.from_lines(iter(input.splitlines()))
 
     def __len__(self):
         return len(self._stacks)
 
-    def __getitem__(self, index: int):
+    def __getitem__(self, index: int) -> StackView:
+        return StackView(self._stacks[index])
+
+    def top_crates(self) -> str:
+        return "".join(stack[0] if stack else "" for stack in self._stacks)
+
+    def snapshot(self) -> "StacksArea":
+        """Copy of the area sharing all stacks, no crate is copied until one of the areas changes a stack."""
+        snapshot = StacksArea(())
+        snapshot._stacks = self._stacks
+        snapshot._hashes = list(self._hashes)
+        self._owned.clear()
+        return snapshot
+
+    def _writable_stack(self, index: int) -> deque[str]:
+        """:return: stack which can be changed, it's copied first when shared with a snapshot"""
+        if index not in self._owned:
+            self._stacks = self._stacks[:index] + (deque(self._stacks[index]),) + self._stacks[index + 1 :]
+            self._owned.add(index)
+        self._hashes[index] = None
         return self._stacks[index]
 
+    def move_crates(self, source: int, target: int, count: int, keep_order: bool = False) -> None:
+        """
+        Moves `count` crates from the top of stack `source` to the top of stack `target`, the only way to change stacks.
+
+        :param keep_order: crates are moved all at once, otherwise one at a time, so their order is reversed
+        """
+        source_stack, target_stack = self._writable_stack(source), self._writable_stack(target)
+        # both calls loop in C, crates taken from the top are in order top first
+        crates = list(starmap(source_stack.popleft, repeat((), count)))
+        # one at a time, each crate lands on the previous one, so extendleft reverses them just like that
+        target_stack.extendleft(reversed(crates) if keep_order else crates)
+
+    def _stack_hash(self, index: int) -> int:
+        if self._hashes[index] is None:
+            self._hashes[index] = hash(tuple(self._stacks[index]))
+        return self._hashes[index]
+
+    def structural_hash(self) -> int:
+        return hash(tuple(map(self._stack_hash, range(len(self._stacks)))))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StacksArea):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        for stack, other_stack in zip(self._stacks, other._stacks):
+            if stack is other_stack:  # shared since a snapshot
+                continue
+            if len(stack) != len(other_stack) or stack != other_stack:
+                return False
+        return True
+
+
+def _write_test_file(test: unittest.TestCase, content: str | bytes) -> str:
+    """Writes `content` to a temporary input file removed after the test, bytes are written as they are."""
+    import tempfile
+
+    with tempfile.NamedTemporaryFile("wb" if isinstance(content, bytes) else "wt", suffix=".in", delete=False) as file:
+        file.write(content)
+    test.addCleanup(os.remove, file.name)
+    return file.name
+
 
 class TestCreateStacksArea(unittest.TestCase):
     def test_empty_input_should_return_empty_stacks_area(self):
@@ -79,25 +180,143 @@ class TestCreateStacksArea(unittest.TestCase):
         self.assertEqual(0, len(stacks_area[1]))
         self.assertEqual(1, len(stacks_area[2]))
 
+    def test_lines_after_drawing_are_left_for_commands(self):
+        lines = iter(["    [D]", "[N] [C]", "[Z] [M] [P]", " 1   2   3 ", "", "move 1 from 2 to 1"])
+        stacks_area = StacksArea.from_lines(lines)
+        self.assertEqual(StacksArea((["N", "Z"], ["D", "C", "M"], ["P"])), stacks_area)
+        self.assertEqual([Command(1, 2, 1)], list(parse_commands(lines)))
+
+    def test_label_row_defines_number_of_stacks(self):
+        stacks_area = StacksArea.from_string("[S]\n 1   2   3")
+        self.assertEqual(3, len(stacks_area))
+        self.assertEqual("S", stacks_area.top_crates())
+
+    def test_read_procedure_from_file(self):
+        file_name = _write_test_file(
+            self, "    [D]    \n[N] [C]    \n[Z] [M] [P]\n 1   2   3 \n\nmove 1 from 2 to 1\nmove 3 from 1 to 3\n"
+        )
+        area, commands = read_procedure_from_file(file_name)
+        self.assertEqual(3, len(area))
+        self.assertEqual([Command(1, 2, 1), Command(3, 1, 3)], list(commands))
+
 
 class OperationalError(Exception):
     pass
 
 
+class Command(NamedTuple):
+    count: int
+    source: int  # stacks are numbered from 1, as in the drawing
+    target: int
+
+    @classmethod
+    def from_string(cls, input: str) -> "Command":
+        match input.split():
+            case "move", count, "from", source, "to", target:
+                return cls(int(count), int(source), int(target))
+        raise ValueError(f"Unknown command: {input!r}")
+
+
+def parse_commands(lines: Iterable[str]) -> Iterator[Command]:
+    return (Command.from_string(line) for line in lines if line.strip())
+
+
+def _read_commands(file: TextIO) -> Iterator[Command]:
+    with file:
+        yield from parse_commands(file)
+
+
+def read_procedure_from_file(file_name: str) -> tuple[StacksArea, Iterator[Command]]:
+    """Reads the drawing right away, commands are parsed lazily as they are consumed."""
+    file = open(file_name, "rt")
+    area = StacksArea.from_lines(file)
+    return area, _read_commands(file)
+
+
 class Crane:
-    def __init__(self):
+    def __init__(self, multi_crate: bool = False):
+        """
+        :param multi_crate: crane moves all crates of a command at once, so they keep their order,
+            otherwise it moves crates one at a time
+        """
         self._area = None
+        self._multi_crate = multi_crate
+        self._journal: list[Command] = []  # executed commands, to be able to undo them
 
     def operate_over(self, area: StacksArea):
         self._area = area
+        self._journal = []
         len(self._area)
         return self
 
-    def execute(self, commands: list):
+    def _move(self, command: Command) -> None:
+        if not (0 < command.source <= len(self._area) and 0 < command.target <= len(self._area)):
+            raise OperationalError(f"There is no such stack in the area: {command}")
+        if len(self._area[command.source - 1]) < command.count:
+            raise OperationalError(f"Not enough crates to move: {command}")
+        if command.source == command.target:  # crates would end up exactly where they were
+            return
+        self._area.move_crates(command.source - 1, command.target - 1, command.count, keep_order=self._multi_crate)
+
+    def execute(self, commands: Iterable[Command]):
         if self._area is None:
             raise OperationalError("No area to operate!")
+        for command in commands:
+            self._move(command)
+            self._journal.append(command)
         return self
 
+    def undo(self, count: int = 1):
+        """Reverts last `count` commands, moving the crates back is the inverse of any move with the same crane."""
+        if count > len(self._journal):
+            raise OperationalError(f"Only {len(self._journal)} commands can be undone!")
+        for _ in range(count):
+            crates, source, target = self._journal.pop()
+            self._move(Command(crates, target, source))
+        return self
+
+    def snapshot(self) -> StacksArea:
+        if self._area is None:
+            raise OperationalError("No area to operate!")
+        return self._area.snapshot()
+
+    def solve_top_crates(self, commands: Iterable[Command]) -> str:
+        """
+        Finds top crates after executing the commands, without moving any crate and changing the area.
+
+        Commands are walked backwards, tracing only where the final top crate of every stack came from. It costs
+        O(stacks * commands) regardless of the number of crates.
+        """
+        if self._area is None:
+            raise OperationalError("No area to operate!")
+        commands = list(commands)
+        sizes = [len(stack) for stack in self._area]
+        for command in commands:  # only stack sizes go forward, to validate commands and find empty stacks
+            if not (0 < command.source <= len(sizes) and 0 < command.target <= len(sizes)):
+                raise OperationalError(f"There is no such stack in the area: {command}")
+            if sizes[command.source - 1] < command.count:
+                raise OperationalError(f"Not enough crates to move: {command}")
+            sizes[command.source - 1] -= command.count
+            sizes[command.target - 1] += command.count
+
+        # positions as (stack index, depth from the top) of final top crates
+        positions = [(stack, 0) for stack, size in enumerate(sizes) if size]
+        for count, source, target in reversed(commands):
+            source, target = source - 1, target - 1
+            if source == target:
+                continue
+            for i, (stack, depth) in enumerate(positions):
+                if stack == target:
+                    if depth < count:  # the crate was moved by this command
+                        positions[i] = source, depth if self._multi_crate else count - 1 - depth
+                    else:
+                        positions[i] = stack, depth - count
+                elif stack == source:
+                    positions[i] = stack, depth + count
+
+        crates = iter(self._area[stack][depth] for stack, depth in positions)
+        return "".join(next(crates) if size else "" for size in sizes)
+
 
 class TestCrane(unittest.TestCase):
     def test_crane_cannot_operate_without_area(self):
@@ -111,3 +330,176 @@ class TestCrane(unittest.TestCase):
         assert_area = deepcopy(area)
         crane.operate_over(area).execute(commands=[])
         self.assertEqual(assert_area, area)
+
+    def test_crane_moves_crates_one_at_a_time(self):
+        area = StacksArea.from_string("    [D]    \n[N] [C]    \n[Z] [M] [P]\n 1   2   3 ")
+        commands = parse_commands(
+            ["move 1 from 2 to 1", "move 3 from 1 to 3", "move 2 from 2 to 1", "move 1 from 1 to 2"]
+        )
+        Crane().operate_over(area).execute(commands)
+        self.assertEqual("CMZ", area.top_crates())
+        self.assertEqual(StacksArea((["C"], ["M"], ["Z", "N", "D", "P"])), area)
+
+    def test_multi_crate_crane_keeps_order_of_crates(self):
+        area = StacksArea.from_string("    [D]    \n[N] [C]    \n[Z] [M] [P]\n 1   2   3 ")
+        commands = parse_commands(
+            ["move 1 from 2 to 1", "move 3 from 1 to 3", "move 2 from 2 to 1", "move 1 from 1 to 2"]
+        )
+        Crane(multi_crate=True).operate_over(area).execute(commands)
+        self.assertEqual("MCD", area.top_crates())
+
+    def test_move_within_the_same_stack_should_do_nothing(self):
+        area = StacksArea((["X", "Y"],))
+        Crane().operate_over(area).execute([Command(2, 1, 1)])
+        self.assertEqual(StacksArea((["X", "Y"],)), area)
+
+    def test_crane_cannot_move_missing_crates(self):
+        area = StacksArea((["X"], []))
+        with self.assertRaises(OperationalError):
+            Crane().operate_over(area).execute([Command(2, 1, 2)])
+        with self.assertRaises(OperationalError):
+            Crane().operate_over(area).execute([Command(1, 1, 3)])
+
+    def test_parse_command(self):
+        self.assertEqual(Command(3, 1, 2), Command.from_string("move 3 from 1 to 2"))
+        with self.assertRaises(ValueError):
+            Command.from_string("lift 3 from 1 to 2")
+
+    def test_solve_top_crates_without_moving_them(self):
+        drawing = "    [D]    \n[N] [C]    \n[Z] [M] [P]\n 1   2   3 "
+        lines = ["move 1 from 2 to 1", "move 3 from 1 to 3", "move 2 from 2 to 1", "move 1 from 1 to 2"]
+        for multi_crate, expected in ((False, "CMZ"), (True, "MCD")):
+            area = StacksArea.from_string(drawing)
+            assert_area = deepcopy(area)
+            result = Crane(multi_crate).operate_over(area).solve_top_crates(parse_commands(lines))
+            self.assertEqual(expected, result)
+            self.assertEqual(assert_area, area)
+
+    def test_solve_top_crates_is_the_same_as_execute(self):
+        import random
+
+        rng = random.Random(5)
+        for multi_crate in (False, True):
+            area = StacksArea(tuple([rng.choice("ABCDEFGHIJ") for _ in range(rng.randint(0, 8))] for _ in range(5)))
+            sizes = [len(stack) for stack in area]
+            commands = []
+            for _ in range(100):
+                source, target = rng.randrange(5), rng.randrange(5)
+                count = rng.randint(0, sizes[source])
+                sizes[source] -= count
+                sizes[target] += count
+                commands.append(Command(count, source + 1, target + 1))
+            crane = Crane(multi_crate).operate_over(area)
+            result = crane.solve_top_crates(commands)
+            crane.execute(commands)
+            self.assertEqual(area.top_crates(), result)
+
+    def test_undo_reverts_commands(self):
+        for multi_crate in (False, True):
+            area = StacksArea.from_string("    [D]    \n[N] [C]    \n[Z] [M] [P]\n 1   2   3 ")
+            assert_area = deepcopy(area)
+            commands = parse_commands(["move 1 from 2 to 1", "move 3 from 1 to 3", "move 2 from 2 to 1"])
+            crane = Crane(multi_crate).operate_over(area).execute(commands)
+            crane.undo(2)
+            self.assertEqual(StacksArea((["D", "N", "Z"], ["C", "M"], ["P"])), area)
+            crane.undo()
+            self.assertEqual(assert_area, area)
+            with self.assertRaises(OperationalError):
+                crane.undo()
+
+
+class TestStacksAreaSnapshot(unittest.TestCase):
+    def test_snapshot_is_not_changed_by_crane(self):
+        area = StacksArea((["X"], [], ["Y", "Z"]))
+        crane = Crane().operate_over(area)
+        snapshot = crane.snapshot()
+        crane.execute([Command(2, 3, 2)])
+        self.assertEqual(StacksArea((["X"], [], ["Y", "Z"])), snapshot)
+        self.assertEqual(StacksArea((["X"], ["Z", "Y"], [])), area)
+
+    def test_branches_from_snapshot_are_independent(self):
+        area = StacksArea((["X"], [], ["Y", "Z"]))
+        branch1, branch2 = area.snapshot(), area.snapshot()
+        Crane().operate_over(branch1).execute([Command(1, 1, 2)])
+        Crane().operate_over(branch2).execute([Command(1, 3, 2)])
+        self.assertEqual("XY", area.top_crates())
+        self.assertEqual("XY", branch1.top_crates())
+        self.assertEqual("XYZ", branch2.top_crates())
+
+    def test_unchanged_stacks_stay_shared(self):
+        area = StacksArea((["X"], [], ["Y", "Z"]))
+        snapshot = area.snapshot()
+        Crane().operate_over(area).execute([Command(1, 3, 2)])
+        self.assertIs(snapshot._stacks[0], area._stacks[0])
+        self.assertIsNot(snapshot._stacks[2], area._stacks[2])
+
+    def test_stacks_are_read_only(self):
+        area = StacksArea((["X"], ["Y"]))
+        snapshot = area.snapshot()
+        with self.assertRaises(AttributeError):
+            area[0].append("Q")
+        with self.assertRaises(TypeError):
+            area[0][0] = "Z"
+        area.move_crates(1, 0, 1)
+        self.assertEqual(StacksArea((["X"], ["Y"])), snapshot)
+        self.assertEqual(["Y", "X"], list(area[0]))
+
+    def test_equality_follows_moved_crates(self):
+        area, other = StacksArea((["X"], ["Y"])), StacksArea((["Y"], ["X"]))
+        area.move_crates(0, 1, 1)
+        other.move_crates(0, 1, 1)
+        self.assertNotEqual(other, area)  # (), (X, Y) and (), (Y, X)
+        area.move_crates(1, 0, 2, keep_order=True)
+        other.move_crates(1, 0, 2)
+        self.assertEqual(other, area)  # both are (X, Y), ()
+        self.assertEqual(other[0], area[0])
+
+    def test_structural_hash_follows_moved_crates(self):
+        area = StacksArea((["X", "Y"], ["Z"]))
+        before = area.structural_hash()
+        area.move_crates(0, 1, 1)
+        self.assertEqual(StacksArea((["Y"], ["X", "Z"])).structural_hash(), area.structural_hash())
+        area.move_crates(1, 0, 1)
+        self.assertEqual(before, area.structural_hash())
+
+    def test_structural_hash(self):
+        area = StacksArea((["X"], [], ["Y", "Z"]))
+        self.assertEqual(StacksArea((["X"], [], ["Y", "Z"])).structural_hash(), area.structural_hash())
+        crane = Crane().operate_over(area).execute([Command(1, 3, 2)])
+        self.assertNotEqual(StacksArea((["X"], [], ["Y", "Z"])).structural_hash(), area.structural_hash())
+        crane.undo()
+        self.assertEqual(StacksArea((["X"], [], ["Y", "Z"])).structural_hash(), area.structural_hash())
+
+
+def load_input(file_name: str) -> tuple[StacksArea, list[Command]]:
+    """Both cranes solve from the same drawing and commands, so the procedure is parsed once."""
+    area, commands = read_procedure_from_file(file_name)
+    return area, list(commands)
+
+
+def solve_part1(procedure: tuple[StacksArea, list[Command]]) -> str:
+    area, commands = procedure
+    return Crane().operate_over(area).solve_top_crates(commands)
+
+
+def solve_part2(procedure: tuple[StacksArea, list[Command]]) -> str:
+    area, commands = procedure
+    return Crane(multi_crate=True).operate_over(area).solve_top_crates(commands)
+
+
+class SolveTestCase(unittest.TestCase):
+    def test_both_parts_from_one_load(self):
+        file_name = _write_test_file(
+            self,
+            "    [D]    \n[N] [C]    \n[Z] [M] [P]\n 1   2   3 \n\n"
+            "move 1 from 2 to 1\nmove 3 from 1 to 3\nmove 2 from 2 to 1\nmove 1 from 1 to 2\n",
+        )
+        procedure = load_input(file_name)
+        self.assertEqual("CMZ", solve_part1(procedure))
+        self.assertEqual("MCD", solve_part2(procedure))
+
+
+if __name__ == "__main__":
+    procedure = load_input("5.in")
+    print("Top crates moved one at a time: ", solve_part1(procedure))
+    print("Top crates moved all at once: ", solve_part2(procedure))
@@ -0,0 +1,134 @@
+"""Runs the puzzle solutions, e.g. ``python -m aoc run 1 2 3 --input DIR``.
+
+Every day module exposes ``load_input``, ``solve_part1`` and ``solve_part2``: the input is loaded once
+and both parts are answered from its parsed form. Import (cold start), load and part timings are
+reported, so startup cost is visible next to the actual work.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import unittest
+from types import ModuleType
+from typing import Iterable, Iterator, NamedTuple
+
+DAYS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class DayReport(NamedTuple):
+    day: int
+    part1: object
+    part2: object
+    import_time: float
+    load_time: float
+    part1_time: float
+    part2_time: float
+
+
+def day_file(day: int) -> str:
+    return os.path.join(DAYS_DIR, f"{day}.py")
+
+
+def input_file(input_dir: str, day: int) -> str:
+    return os.path.join(input_dir, f"{day}.in")
+
+
+def import_day(day: int) -> ModuleType:
+    """Day modules are named by their number, so they are imported from their file location."""
+    spec = importlib.util.spec_from_file_location(f"day{day}", day_file(day))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # dataclasses and pickling look the module up by name
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_day(day: int, input_dir: str) -> DayReport:
+    start = time.perf_counter()
+    module = import_day(day)
+    imported = time.perf_counter()
+    data = module.load_input(input_file(input_dir, day))
+    loaded = time.perf_counter()
+    part1 = module.solve_part1(data)
+    part1_done = time.perf_counter()
+    part2 = module.solve_part2(data)
+    part2_done = time.perf_counter()
+    return DayReport(
+        day, part1, part2, imported - start, loaded - imported, part1_done - loaded, part2_done - part1_done
+    )
+
+
+def run(days: Iterable[int], input_dir: str) -> Iterator[DayReport]:
+    for day in days:
+        yield run_day(day, input_dir)
+
+
+def format_report(report: DayReport) -> str:
+    return (
+        f"Day {report.day}: import {report.import_time * 1000:.1f} ms, load {report.load_time * 1000:.1f} ms\n"
+        f"  part 1: {report.part1} ({report.part1_time * 1000:.1f} ms)\n"
+        f"  part 2: {report.part2} ({report.part2_time * 1000:.1f} ms)"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(prog="python -m aoc")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="solve both parts of the given days")
+    run_parser.add_argument("days", nargs="+", type=int, help="numbers of days to solve")
+    run_parser.add_argument("--input", default=".", help="directory with <day>.in input files")
+    args = parser.parse_args(argv)
+    missing = [
+        file_name
+        for day in args.days
+        for file_name in (day_file(day), input_file(args.input, day))
+        if not os.path.exists(file_name)
+    ]
+    if missing:
+        parser.error(f"missing files: {', '.join(missing)}")
+    for report in run(args.days, args.input):
+        print(format_report(report))
+    print(f"Total: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+class RunnerTestCase(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.input_dir = directory.name
+        with open(input_file(self.input_dir, 4), "wt") as file:
+            file.write("2-4,6-8\n2-3,4-5\n5-7,7-9\n2-8,3-7\n6-6,4-6\n2-6,4-8\n")
+
+    def test_run_day(self):
+        report = run_day(4, self.input_dir)
+        self.assertEqual((4, 2, 4), (report.day, report.part1, report.part2))
+        self.assertTrue(all(timing >= 0 for timing in report[3:]))
+
+    def test_main_prints_both_parts(self):
+        import contextlib
+        import io
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(["run", "4", "--input", self.input_dir])
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("Day 4: import "))
+        self.assertTrue(lines[1].startswith("  part 1: 2 ("))
+        self.assertTrue(lines[2].startswith("  part 2: 4 ("))
+        self.assertTrue(lines[3].startswith("Total: "))
+
+    def test_missing_input_should_exit(self):
+        import contextlib
+        import io
+
+        with contextlib.redirect_stderr(io.StringIO()) as errors, self.assertRaises(SystemExit):
+            main(["run", "1", "4", "--input", self.input_dir])
+        self.assertIn(input_file(self.input_dir, 1), errors.getvalue())
+
+
+if __name__ == "__main__":
+    main()